@@ -1,21 +1,86 @@
 from dotenv import load_dotenv
 import os
 import shutil
+import asyncio
 import logging
+import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime
 
 # Load environment variables from .env file
 load_dotenv()
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from starlette.background import BackgroundTask
+from fastapi.responses import StreamingResponse, FileResponse, JSONResponse, PlainTextResponse
 import json
-from main import run_pipeline
-from core.utils import extract_text_from_file
+from main import run_pipeline, iter_pipeline
+from core.extraction import ExtractionService, ExtractionError, TooManyPagesError
+from core.uploads import (
+    MULTIPART_OVERHEAD_BYTES, SpooledUpload, UnsupportedUploadError, UploadTooLargeError,
+    receive_upload,
+)
+from core.verdict_cache import invalidate_verdicts
+from core.jobs import JobQueue, JobWorkerPool
+from core.report_store import ReportStore, contract_key
+from core.revision import revise_from_parent
+from core.fingerprint import pipeline_fingerprint
+from core.compression import CODECS, resolve_codec, iter_decompress_file
+from models.limiter import limiter_snapshot
+from models.breaker import breaker_snapshot
+from models.usage import usage_snapshot
+from config.settings import (
+    JOB_QUEUE_PATH, JOB_UPLOADS_DIR, JOB_WORKERS, JOB_MAX_ATTEMPTS, REPORT_INDEX_PATH,
+    REPORT_COMPRESSION, EXTRACTION_WORKERS, EXTRACTION_PAGES_PER_TASK,
+    EXTRACTION_PAGE_TIMEOUT_SECS, EXTRACTION_MAX_PAGES, PDF_BACKEND, CONTRACT_CACHE_ENABLED,
+)
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Contract Risk Management API")
+
+# ─── Background job workers ───────────────────────────────────────────────────
+
+async def run_job(job, report_progress):
+    """Analyse a queued upload end to end; returns the saved report id."""
+    upload = await asyncio.to_thread(
+        SpooledUpload.from_file, job["upload_path"], job["filename"], job["ext"]
+    )
+    contract_text, extraction_stats = await extract_contract_text(upload)
+
+    results = []
+    pipeline_stats = {"extraction": extraction_stats}
+    done = 0
+    async for event in iter_pipeline(contract_text, run_stats=pipeline_stats):
+        if event["event"] == "segmentation":
+            results = [None] * event["data"]["clause_count"]
+            await report_progress(0, len(results))
+        elif event["event"] == "clause":
+            results[event["data"]["index"]] = event["data"]["result"]
+            done += 1
+            await report_progress(done, len(results))
+
+    return await asyncio.to_thread(save_report, upload, contract_text, results, pipeline_stats)
+
+
+job_queue = JobQueue(JOB_QUEUE_PATH, max_attempts=JOB_MAX_ATTEMPTS)
+job_workers = JobWorkerPool(job_queue, run_job, n_workers=JOB_WORKERS)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Index report files written before the report store existed
+    await asyncio.to_thread(report_store.import_legacy_reports)
+    # Jobs left 'running' by a previous process are re-queued on start
+    job_workers.start()
+    yield
+    await job_workers.stop()
+    extraction_service.shutdown()
+
+
+app = FastAPI(title="Contract Risk Management API", lifespan=lifespan)
 
 # ─── CORS ────────────────────────────────────────────────────────────────────
 # In production (Railway), set FRONTEND_URL env var to your frontend's domain.
@@ -27,12 +92,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # ─── Storage paths ────────────────────────────────────────────────────────────
-STATS_FILE = "stats.json"
 REPORTS_DIR = "reports"
 UPLOADS_DIR = "uploads"
+SPOOL_DIR = "spool"        # uploads still being received or analysed
 
 ALLOWED_EXTENSIONS = {".pdf", ".docx", ".doc", ".txt"}
 MAX_FILE_SIZE_BYTES = 20 * 1024 * 1024  # 20 MB
@@ -41,6 +107,21 @@ if not os.path.exists(REPORTS_DIR):
     os.makedirs(REPORTS_DIR)
 if not os.path.exists(UPLOADS_DIR):
     os.makedirs(UPLOADS_DIR)
+os.makedirs(JOB_UPLOADS_DIR, exist_ok=True)
+# Anything left in the spool belongs to requests that died with a previous process
+shutil.rmtree(SPOOL_DIR, ignore_errors=True)
+os.makedirs(SPOOL_DIR)
+
+report_store = ReportStore(REPORT_INDEX_PATH, REPORTS_DIR, codec=resolve_codec(REPORT_COMPRESSION))
+# Reports are stamped with this so a re-upload under the same pipeline can reuse them
+PIPELINE_FINGERPRINT = pipeline_fingerprint()
+extraction_service = ExtractionService(
+    workers=EXTRACTION_WORKERS,
+    pages_per_task=EXTRACTION_PAGES_PER_TASK,
+    page_timeout=EXTRACTION_PAGE_TIMEOUT_SECS,
+    max_pages=EXTRACTION_MAX_PAGES,
+    backend=PDF_BACKEND,
+)
 
 # ─── Startup warning for ephemeral filesystems (e.g. Railway) ────────────────
 logging.basicConfig(level=logging.INFO)
@@ -51,108 +132,85 @@ logger.warning(
 )
 
 
-# ─── Stats helpers ────────────────────────────────────────────────────────────
-
-def reconcile_stats():
-    """Recalculate stats based on actual report files."""
-    total_contracts = 0
-    high_risk_contracts = 0
-    total_risky_clauses = 0
-    total_clauses = 0
-    total_risk_sum = 0
-    risk_distribution = {"high": 0, "medium": 0, "low": 0, "none": 0}
-    business_impact = {"cash_flow": 0, "legal": 0, "ops": 0}
+# ─── Report helpers ───────────────────────────────────────────────────────────
+
+def save_report(upload, contract_text, results, pipeline_stats):
+    """Persist the report JSON and move the original upload next to it; returns the report id."""
+    filename = upload.filename
+    report_id = f"{int(datetime.now().timestamp())}_{filename.replace(' ', '_')}"
+    report_data = {
+        "id": report_id,
+        "filename": filename,
+        "file_sha256": upload.sha256,
+        "file_size": upload.size,
+        "pipeline_fingerprint": PIPELINE_FINGERPRINT,
+        "results": results,
+        "contract_text": contract_text,
+        "timestamp": datetime.now().isoformat(),
+        "pipeline_stats": pipeline_stats,
+    }
 
-    if not os.path.exists(REPORTS_DIR):
-        logger.warning("Reports directory %s not found.", REPORTS_DIR)
-        return {
-            "total_contracts": 0,
-            "high_risk_contracts": 0,
-            "total_risky_clauses": 0,
-            "avg_risk_score": 0,
-            "total_clauses": 0,
-            "risk_distribution": risk_distribution,
-            "business_impact": business_impact,
-        }
+    report_store.add(report_data)
 
-    all_files = os.listdir(REPORTS_DIR)
-    logger.info("Found %d files in %s", len(all_files), REPORTS_DIR)
+    # ── Save original file ────────────────────────────────────────────────────
+    save_ext = upload.ext if upload.ext else ".pdf"
+    upload.move_to(os.path.join(UPLOADS_DIR, f"{report_id}{save_ext}"))
 
-    for filename in all_files:
-        if not filename.endswith(".json"):
-            continue
-        try:
-            with open(os.path.join(REPORTS_DIR, filename), "r") as f:
-                data = json.load(f)
-            results = data.get("results", [])
-            total_contracts += 1
-            total_clauses += len(results)
-
-            has_high = False
-            contract_risk = 0
-            for res in results:
-                rl = res.get("risk_level", "None").lower()
-                if rl == "moderate":
-                    rl = "medium"
-                risk_distribution[rl] = risk_distribution.get(rl, 0) + 1
-
-                text = res.get("clause_text", "").lower()
-                if any(k in text for k in ["payment", "fee", "price"]):
-                    business_impact["cash_flow"] += 1
-                elif any(k in text for k in ["termination", "liability", "indemni"]):
-                    business_impact["legal"] += 1
-                elif any(k in text for k in ["deliver", "service", "timeline"]):
-                    business_impact["ops"] += 1
-
-                if rl not in ("none", ""):
-                    total_risky_clauses += 1
-                if rl == "high":
-                    has_high = True
-                contract_risk += res.get("final_risk_score", 0)
-
-            if has_high:
-                high_risk_contracts += 1
-            if results:
-                total_risk_sum += contract_risk / len(results)
+    return report_id
 
-        except Exception as e:
-            logger.warning("Skipping malformed report file %s: %s", filename, e)
-            continue
-
-    stats = {
-        "total_contracts": total_contracts,
-        "high_risk_contracts": high_risk_contracts,
-        "total_risky_clauses": total_risky_clauses,
-        "avg_risk_score": (total_risk_sum / total_contracts) if total_contracts > 0 else 0,
-        "total_clauses": total_clauses,
-        "risk_distribution": risk_distribution,
-        "business_impact": business_impact,
-    }
-    save_stats(stats)
-    return stats
 
+async def read_upload(request: Request):
+    """
+    Stream the multipart "file" field of the request to the spool directory;
+    returns a SpooledUpload. Bodies declaring more than the size limit are
+    refused before any of them is read.
+    """
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > MAX_FILE_SIZE_BYTES + MULTIPART_OVERHEAD_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum allowed is {MAX_FILE_SIZE_BYTES // (1024 * 1024)} MB."
+        )
 
-def load_stats():
-    if os.path.exists(STATS_FILE):
-        try:
-            with open(STATS_FILE, "r") as f:
-                stats = json.load(f)
-            # Reconcile if missing newer keys
-            if "high_risk_contracts" not in stats or "business_impact" not in stats:
-                return reconcile_stats()
-            return stats
-        except Exception as e:
-            logger.warning("Could not read stats file, reconciling: %s", e)
-            return reconcile_stats()
-    return reconcile_stats()
+    try:
+        return await receive_upload(request, SPOOL_DIR, ALLOWED_EXTENSIONS, MAX_FILE_SIZE_BYTES)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedUploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# The upload routes parse their own body (see read_upload); this keeps the
+# "file" form field in the OpenAPI docs
+UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
 
 
-def save_stats(stats):
+async def extract_contract_text(upload):
+    """Extract text off the event loop; returns (text, extraction stats)."""
     try:
-        with open(STATS_FILE, "w") as f:
-            json.dump(stats, f)
-    except Exception as e:
-        logger.error("Failed to save stats: %s", e)
+        contract_text, extraction_stats = await extraction_service.extract(
+            upload.path, upload.filename
+        )
+    except TooManyPagesError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ExtractionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not contract_text.strip():
+        raise HTTPException(status_code=400, detail="Could not extract text from file.")
+    return contract_text, extraction_stats
 
 
 # ─── Routes ───────────────────────────────────────────────────────────────────
@@ -163,155 +221,346 @@ async def health_check():
     return {"status": "ok"}
 
 
-@app.post("/analyze")
-async def analyze_contract(file: UploadFile = File(...)):
-    # ── Input validation ──────────────────────────────────────────────────────
-    ext = os.path.splitext(file.filename or "")[1].lower()
-    if ext not in ALLOWED_EXTENSIONS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported file type '{ext}'. Allowed: {', '.join(ALLOWED_EXTENSIONS)}"
-        )
+@app.get("/limits")
+async def get_provider_limits():
+    """Live per-provider limiter state (concurrency, buckets, 429 count)."""
+    return limiter_snapshot()
 
-    content = await file.read()
 
-    if len(content) > MAX_FILE_SIZE_BYTES:
-        raise HTTPException(
-            status_code=413,
-            detail=f"File too large ({len(content) // (1024*1024)} MB). Maximum allowed is 20 MB."
-        )
+@app.get("/breakers")
+async def get_circuit_breakers():
+    """Per-provider circuit breaker state and counters."""
+    return breaker_snapshot()
 
-    try:
-        contract_text = extract_text_from_file(content, file.filename)
 
-        if not contract_text.strip():
-            raise HTTPException(status_code=400, detail="Could not extract text from file.")
+@app.get("/usage")
+async def get_token_usage():
+    """Per-provider token counts reported by the APIs, including prompt-cache hits."""
+    return usage_snapshot()
 
-        results = await run_pipeline(contract_text)
 
-        # ── Update metrics ────────────────────────────────────────────────────
-        stats = load_stats()
-        stats["total_contracts"] += 1
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics: stage and provider latencies, provider errors and retries, cache hits, load."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
-        contract_total_risk = 0
-        has_high_risk = False
 
-        for res in results:
-            stats["total_clauses"] += 1
-            risk_level = res.get("risk_level", "None")
-            stats["risk_distribution"][risk_level] = stats["risk_distribution"].get(risk_level, 0) + 1
+def cached_report(upload):
+    """The stored report for this exact file under the current pipeline, or None."""
+    report_id = report_store.find_by_contract_key(contract_key(upload.sha256, PIPELINE_FINGERPRINT))
+    return report_store.get(report_id) if report_id is not None else None
 
-            text = res.get("clause_text", "").lower()
-            if any(k in text for k in ["payment", "fee", "price"]):
-                stats["business_impact"]["cash_flow"] += 1
-            elif any(k in text for k in ["termination", "liability", "indemni"]):
-                stats["business_impact"]["legal"] += 1
-            elif any(k in text for k in ["deliver", "service", "timeline"]):
-                stats["business_impact"]["ops"] += 1
 
-            if risk_level not in ("None", ""):
-                stats["total_risky_clauses"] += 1
-            if risk_level == "High":
-                has_high_risk = True
+async def cached_revision(report, parent_report_id, parent_results):
+    """
+    The "revision" entry for a stored report served against parent_report_id:
+    the one it was analysed with if that was the same parent, else a fresh
+    alignment of its clauses with the parent's.
+    """
+    if parent_report_id is None:
+        return None
+    revision = report.get("pipeline_stats", {}).get("revision")
+    if revision is None or revision.get("parent_report_id") != parent_report_id:
+        _, revision = await asyncio.to_thread(revise_from_parent, parent_results, report["results"])
+        revision["parent_report_id"] = parent_report_id
+    return revision
 
-            risk_score = res.get("final_risk_score", 0)
-            contract_total_risk += risk_score
 
-        if has_high_risk:
-            stats["high_risk_contracts"] += 1
+@app.post("/analyze", openapi_extra=UPLOAD_REQUEST_BODY)
+async def analyze_contract(
+    request: Request,
+    force: bool = Query(False, description="Re-analyse even if this exact file was analysed before"),
+    parent_report_id: Optional[str] = Query(
+        None, description="Earlier version of this contract; its unchanged clauses are reused"
+    ),
+):
+    # ── Input validation ──────────────────────────────────────────────────────
+    parent_results = None
+    if parent_report_id is not None:
+        # Checked against the index first: the id becomes part of a file path
+        if not await asyncio.to_thread(report_store.exists, parent_report_id):
+            raise HTTPException(status_code=404, detail="Parent report not found")
+        parent_results = await asyncio.to_thread(report_store.get_field, parent_report_id, "results")
+        parent_results = parent_results or []
+    upload = await read_upload(request)
 
-        avg_contract_risk = (contract_total_risk / len(results)) if results else 0
-        stats["avg_risk_score"] = (
-            (stats["avg_risk_score"] * (stats["total_contracts"] - 1) + avg_contract_risk)
-            / stats["total_contracts"]
+    try:
+        # ── Same file, same pipeline: return the stored report ────────────────
+        if CONTRACT_CACHE_ENABLED and not force:
+            report = await asyncio.to_thread(cached_report, upload)
+            if report is not None:
+                logger.info("Contract cache hit for %s: report %s", upload.filename, report["id"])
+                return {
+                    "id": report["id"],
+                    "filename": report["filename"],
+                    "results": report["results"],
+                    "overall_stats": await asyncio.to_thread(report_store.dashboard_stats),
+                    "pipeline_stats": report.get("pipeline_stats", {}),
+                    "contract_text": report["contract_text"],
+                    "cached": True,
+                    "revision": await cached_revision(report, parent_report_id, parent_results),
+                }
+
+        contract_text, extraction_stats = await extract_contract_text(upload)
+
+        pipeline_stats = {"extraction": extraction_stats}
+        results = await run_pipeline(
+            contract_text, run_stats=pipeline_stats, parent_results=parent_results
         )
+        if parent_report_id is not None:
+            pipeline_stats["revision"]["parent_report_id"] = parent_report_id
 
-        save_stats(stats)
+        # ── Save report & refresh metrics ─────────────────────────────────────
+        report_id = await asyncio.to_thread(
+            save_report, upload, contract_text, results, pipeline_stats
+        )
+        stats = await asyncio.to_thread(report_store.dashboard_stats)
 
-        # ── Save individual report ────────────────────────────────────────────
-        report_id = f"{int(datetime.now().timestamp())}_{file.filename.replace(' ', '_')}"
-        report_data = {
+        return {
             "id": report_id,
-            "filename": file.filename,
+            "filename": upload.filename,
             "results": results,
+            "overall_stats": stats,
+            "pipeline_stats": pipeline_stats,
             "contract_text": contract_text,
-            "timestamp": datetime.now().isoformat(),
+            "cached": False,
+            "revision": pipeline_stats.get("revision"),
         }
 
-        with open(os.path.join(REPORTS_DIR, f"{report_id}.json"), "w") as f:
-            json.dump(report_data, f)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error during analysis of %s: %s", upload.filename, e)
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        upload.discard()
+
+
+def _accepts_encoding(request, encoding):
+    """True if the client's Accept-Encoding allows `encoding` (q > 0)."""
+    for token in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = token.strip().partition(";")
+        if name.strip().lower() in (encoding, "*"):
+            q = params.strip()
+            try:
+                return not q.startswith("q=") or float(q[2:]) > 0
+            except ValueError:
+                return False
+    return False
+
+
+async def serve_report_part(request, report_id, part):
+    """
+    Serve a report's stored "results" or "text" file. The compressed file is
+    streamed as-is with Content-Encoding when the client accepts the codec,
+    otherwise it is decompressed on the fly (in Starlette's threadpool).
+    """
+    media_type = "application/json" if part == "results" else "text/plain; charset=utf-8"
+    located = await asyncio.to_thread(report_store.body_part, report_id, part)
+    if located is None or not os.path.exists(located[0]):
+        # Legacy single-file report (or missing)
+        field = "results" if part == "results" else "contract_text"
+        try:
+            value = await asyncio.to_thread(report_store.get_field, report_id, field)
+        except KeyError:
+            raise HTTPException(status_code=404, detail="Report not found")
+        return JSONResponse(value) if part == "results" else PlainTextResponse(value or "")
+
+    path, codec = located
+    encoding = CODECS[codec][1]
+    if _accepts_encoding(request, encoding):
+        return FileResponse(
+            path, media_type=media_type,
+            headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+        )
+    return StreamingResponse(
+        iter_decompress_file(codec, path), media_type=media_type,
+        headers={"Vary": "Accept-Encoding"},
+    )
 
-        # ── Save original file ────────────────────────────────────────────────
-        save_ext = ext if ext else ".pdf"
-        upload_filename = f"{report_id}{save_ext}"
-        with open(os.path.join(UPLOADS_DIR, upload_filename), "wb") as f:
-            f.write(content)
 
-        return {
-            "id": report_id,
-            "filename": file.filename,
-            "results": results,
-            "overall_stats": stats,
-            "contract_text": contract_text,
-        }
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.post("/analyze/stream", openapi_extra=UPLOAD_REQUEST_BODY)
+async def analyze_contract_stream(request: Request):
+    """
+    Streaming variant of /analyze using Server-Sent Events.
 
+    Emits a "segmentation" event, then one "clause" event per clause as soon
+    as its verdict is ready, then a final "stats" event carrying the saved
+    report id. Failures are reported as an "error" event.
+    """
+    upload = await read_upload(request)
+    filename = upload.filename
+    try:
+        contract_text, extraction_stats = await extract_contract_text(upload)
     except HTTPException:
+        upload.discard()
         raise
     except Exception as e:
-        logger.error("Error during analysis of %s: %s", file.filename, e)
+        upload.discard()
+        logger.error("Error extracting text from %s: %s", filename, e)
         raise HTTPException(status_code=500, detail=str(e))
 
+    async def event_stream():
+        results = []
+        try:
+            async for event in iter_pipeline(contract_text):
+                data = event["data"]
+                if event["event"] == "segmentation":
+                    results = [None] * data["clause_count"]
+                elif event["event"] == "clause":
+                    results[data["index"]] = data["result"]
+                elif event["event"] == "stats":
+                    data = {"extraction": extraction_stats, **data}
+                    report_id = await asyncio.to_thread(
+                        save_report, upload, contract_text, results, data
+                    )
+                    stats = await asyncio.to_thread(report_store.dashboard_stats)
+                    data = {
+                        "id": report_id,
+                        "filename": filename,
+                        "pipeline_stats": data,
+                        "overall_stats": stats,
+                    }
+                yield _sse(event["event"], data)
+        except Exception as e:
+            logger.error("Error during streaming analysis of %s: %s", filename, e)
+            yield _sse("error", {"detail": str(e)})
+        finally:
+            upload.discard()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also covers a client that disconnects before the stream starts
+        background=BackgroundTask(upload.discard),
+    )
+
+
+@app.post("/jobs", status_code=202, openapi_extra=UPLOAD_REQUEST_BODY)
+async def submit_job(request: Request):
+    """Queue a contract for background analysis and return its job id immediately."""
+    upload = await read_upload(request)
+    upload.move_to(os.path.join(JOB_UPLOADS_DIR, f"{uuid.uuid4().hex}{upload.ext}"))
+
+    job_id = await asyncio.to_thread(job_queue.submit, upload.filename, upload.ext, upload.path)
+    job_workers.notify()
+    return {"job_id": job_id, "status": "queued"}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job.pop("upload_path", None)
+    return job
+
+
+@app.get("/jobs/{job_id}/progress")
+async def get_job_progress(job_id: str):
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    total = job["clauses_total"]
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "clauses_done": job["clauses_done"],
+        "clauses_total": total,
+        "percent": round(100 * job["clauses_done"] / total, 1) if total else 0.0,
+        "report_id": job["report_id"],
+    }
+
 
 @app.get("/dashboard-stats")
 async def get_stats():
-    logger.info("Reconciling stats for dashboard...")
-    return reconcile_stats()
+    return await asyncio.to_thread(report_store.dashboard_stats)
 
 
-@app.get("/reports")
-async def get_reports():
-    reports = []
-    for filename in os.listdir(REPORTS_DIR):
-        if not filename.endswith(".json"):
-            continue
-        report_path = os.path.join(REPORTS_DIR, filename)
-        try:
-            with open(report_path, "r") as f:
-                data = json.load(f)
-            results = data.get("results", [])
-            risky_clauses = [r for r in results if r.get("risk_level", "None").lower() != "none"]
-
-            has_high = any(r.get("risk_level", "").lower() == "high" for r in results)
-            has_med = any(r.get("risk_level", "").lower() in ["medium", "moderate"] for r in results)
-            overall_risk = "High" if has_high else "Medium" if has_med else "Low"
-
-            reports.append({
-                "id": data.get("id"),
-                "filename": data.get("filename"),
-                "timestamp": data.get("timestamp"),
-                "status": "completed",
-                "risk_level": overall_risk,
-                "flagged_count": len(risky_clauses),
-            })
-        except Exception as e:
-            logger.warning("Skipping malformed report file %s: %s", filename, e)
-            continue
+@app.post("/dashboard-stats/reconcile")
+async def reconcile_dashboard_stats():
+    """Repair: rebuild the report index and dashboard totals from the report files."""
+    return await asyncio.to_thread(report_store.reconcile)
+
 
-    reports.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
+@app.get("/reports")
+async def get_reports(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    risk_level: Optional[str] = None,
+    filename_prefix: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    """
+    Report listing, newest first, served from the report index.
+
+    - limit / cursor: keyset pagination; the cursor for the next page is
+      returned in the X-Next-Cursor header (absent on the last page).
+      Without limit every matching report is returned.
+    - risk_level: comma-separated overall risk levels (High, Medium, Low)
+    - filename_prefix, since (inclusive), until (exclusive): ISO timestamps
+    - fields: comma-separated projection; summary fields never open report
+      bodies, while results / contract_text / pipeline_stats do
+    """
+    try:
+        reports, next_cursor = await asyncio.to_thread(
+            report_store.list,
+            limit=limit,
+            cursor=cursor,
+            risk_levels=risk_level.split(",") if risk_level else None,
+            filename_prefix=filename_prefix,
+            since=since,
+            until=until,
+            fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return reports
 
 
 @app.get("/reports/{report_id}")
 async def get_report(report_id: str):
-    report_path = os.path.join(REPORTS_DIR, f"{report_id}.json")
-    if not os.path.exists(report_path):
-        raise HTTPException(status_code=404, detail="Report not found")
     try:
-        with open(report_path, "r") as f:
-            return json.load(f)
+        body = await asyncio.to_thread(report_store.get_json, report_id)
     except Exception as e:
         logger.error("Error reading report %s: %s", report_id, e)
         raise HTTPException(status_code=500, detail="Failed to read report")
+    if body is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+    return Response(content=body, media_type="application/json")
+
+
+@app.get("/reports/{report_id}/results")
+async def get_report_results(report_id: str, request: Request):
+    """Only the clause results (a JSON array), without the contract text."""
+    return await serve_report_part(request, report_id, "results")
+
+
+@app.get("/reports/{report_id}/text")
+async def get_report_text(report_id: str, request: Request):
+    """Only the extracted contract text."""
+    return await serve_report_part(request, report_id, "text")
+
+
+@app.get("/reports/{report_id}/clauses/{index}")
+async def get_report_clause(report_id: str, index: int):
+    """A single clause result by position; only that clause is decompressed."""
+    try:
+        return await asyncio.to_thread(report_store.get_clause, report_id, index)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Report not found")
+    except IndexError:
+        raise HTTPException(status_code=404, detail="Clause not found")
 
 
 @app.get("/reports/{report_id}/file")
@@ -320,7 +569,6 @@ async def get_report_file(report_id: str):
     for ext in [".pdf", ".docx", ".doc", ".txt", ""]:
         candidate = os.path.join(UPLOADS_DIR, f"{report_id}{ext}")
         if os.path.exists(candidate):
-            from fastapi.responses import FileResponse
             media_types = {
                 ".pdf": "application/pdf",
                 ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
@@ -332,21 +580,36 @@ async def get_report_file(report_id: str):
     raise HTTPException(status_code=404, detail="Original file not found")
 
 
+def remove_upload(report_id):
+    """Remove the original upload saved next to a report, if any."""
+    for ext in [".pdf", ".docx", ".doc", ".txt", ""]:
+        candidate = os.path.join(UPLOADS_DIR, f"{report_id}{ext}")
+        if os.path.exists(candidate):
+            os.remove(candidate)
+            break
+
+
+def clear_reports():
+    """Remove every report body, upload and summary row."""
+    if os.path.exists(REPORTS_DIR):
+        shutil.rmtree(REPORTS_DIR)
+    os.makedirs(REPORTS_DIR)
+
+    if os.path.exists(UPLOADS_DIR):
+        shutil.rmtree(UPLOADS_DIR)
+    os.makedirs(UPLOADS_DIR)
+
+    report_store.clear()
+
+
 @app.delete("/reports/{report_id}")
 async def delete_report(report_id: str):
-    report_path = os.path.join(REPORTS_DIR, f"{report_id}.json")
-    if not os.path.exists(report_path):
+    if not await asyncio.to_thread(report_store.exists, report_id):
         raise HTTPException(status_code=404, detail="Report not found")
 
     try:
-        os.remove(report_path)
-        # Remove any associated upload file
-        for ext in [".pdf", ".docx", ".doc", ".txt", ""]:
-            candidate = os.path.join(UPLOADS_DIR, f"{report_id}{ext}")
-            if os.path.exists(candidate):
-                os.remove(candidate)
-                break
-        reconcile_stats()
+        await asyncio.to_thread(report_store.delete, report_id)
+        await asyncio.to_thread(remove_upload, report_id)
         return {"status": "success"}
     except Exception as e:
         logger.error("Error deleting report %s: %s", report_id, e)
@@ -356,21 +619,20 @@ async def delete_report(report_id: str):
 @app.delete("/reports")
 async def delete_all_reports():
     try:
-        if os.path.exists(REPORTS_DIR):
-            shutil.rmtree(REPORTS_DIR)
-        os.makedirs(REPORTS_DIR)
-
-        if os.path.exists(UPLOADS_DIR):
-            shutil.rmtree(UPLOADS_DIR)
-        os.makedirs(UPLOADS_DIR)
-
-        reconcile_stats()
+        await asyncio.to_thread(clear_reports)
         return {"status": "success"}
     except Exception as e:
         logger.error("Error clearing all reports: %s", e)
         raise HTTPException(status_code=500, detail="Failed to clear reports")
 
 
+@app.delete("/cache/verdicts")
+async def clear_verdict_cache():
+    """Drop every cached clause verdict (e.g. after hand-editing prompts)."""
+    await asyncio.to_thread(invalidate_verdicts)
+    return {"status": "success"}
+
+
 if __name__ == "__main__":
     import uvicorn
     # Railway injects $PORT; defaults to 8000 for local development
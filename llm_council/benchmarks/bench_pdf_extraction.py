@@ -0,0 +1,87 @@
+"""
+Compare PDF text backends (pdfplumber, pdfium, auto) on a corpus of PDFs.
+
+Reports pages per second for each backend and output fidelity: the word-level
+similarity of each backend's text to pdfplumber's, per document. "auto" also
+reports how many pages fell back to pdfplumber.
+
+Usage (from llm_council/):
+    python -m benchmarks.bench_pdf_extraction uploads/ ../"Golden Clause" --repeat 3
+"""
+import argparse
+import difflib
+import os
+import statistics
+import time
+from core.utils import extract_pdf_pages, pdf_page_count
+
+BACKENDS = ("pdfplumber", "pdfium", "auto")
+
+
+def find_pdfs(paths):
+    pdfs = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                pdfs.extend(os.path.join(root, f) for f in sorted(files) if f.lower().endswith(".pdf"))
+        elif path.lower().endswith(".pdf"):
+            pdfs.append(path)
+    return pdfs
+
+
+def extract(path, backend):
+    """Whole-document text and the number of fallback pages."""
+    texts, fallbacks = extract_pdf_pages(path, backend=backend)
+    return "\n".join(texts), len(fallbacks)
+
+
+def similarity(reference, text):
+    return difflib.SequenceMatcher(None, reference.split(), text.split(), autojunk=False).ratio()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="*", default=["uploads"],
+                        help="PDF files or directories to search for PDFs")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="extractions per document and backend; the fastest is kept")
+    args = parser.parse_args()
+
+    pdfs = find_pdfs(args.paths)
+    if not pdfs:
+        parser.error("no PDFs found")
+
+    total_pages = sum(pdf_page_count(path) for path in pdfs)
+    rows = []
+    references = {path: extract(path, "pdfplumber")[0] for path in pdfs}
+    for backend in BACKENDS:
+        secs = 0.0
+        fallbacks = 0
+        scores = []
+        for path in pdfs:
+            best = float("inf")
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                text, n_fallbacks = extract(path, backend)
+                best = min(best, time.perf_counter() - started)
+            secs += best
+            fallbacks += n_fallbacks
+            scores.append(similarity(references[path], text))
+        rows.append({
+            "backend": backend,
+            "secs": secs,
+            "pages_per_sec": total_pages / secs if secs else float("inf"),
+            "fidelity_mean": statistics.mean(scores),
+            "fidelity_min": min(scores),
+            "fallback_pages": fallbacks,
+        })
+
+    print(f"{len(pdfs)} PDFs, {total_pages} pages (fidelity = word similarity to pdfplumber)")
+    print(f"{'backend':<12}{'secs':>9}{'pages/s':>10}{'fid mean':>10}{'fid min':>9}{'fallbacks':>11}")
+    for r in rows:
+        print(f"{r['backend']:<12}{r['secs']:>9.3f}{r['pages_per_sec']:>10.1f}"
+              f"{r['fidelity_mean']:>10.3f}{r['fidelity_min']:>9.3f}{r['fallback_pages']:>11}")
+
+
+if __name__ == "__main__":
+    main()
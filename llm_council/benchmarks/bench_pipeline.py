@@ -0,0 +1,247 @@
+"""
+End-to-end pipeline benchmark on synthetic contracts with simulated providers.
+
+Every entry of MODEL_REGISTRY is replaced by a FakeProvider with lognormal
+latency and configurable failure, 429 and disagreement rates (disagreements
+send golden clauses through council review). The fakes sit behind the
+providers' rate limiters like the real wrappers, so PROVIDER_LIMITS and the
+AIMD concurrency apply, in simulated time like latencies and retry backoff.
+run_pipeline is then timed on synthetic contracts of each requested size,
+reporting wall time, p50/p95/p99 latency per stage, LLM calls and
+(estimated) tokens per clause and peak Python memory. No API is called; the
+LLM response and verdict caches are disabled and their files go to a
+temporary directory. Results can be written to a JSON baseline and compared
+against a previous one.
+
+Usage (from llm_council/):
+    python -m benchmarks.bench_pipeline --sizes 10,50,200,500 --output baseline.json
+    python -m benchmarks.bench_pipeline --compare baseline.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from benchmarks.bench_scheduler import percentile
+
+_GOLDEN_TEMPLATES = (
+    "Payment Terms. The Customer shall pay each invoice within {n} days; late fees accrue at {m}% per month.",
+    "Termination. Either party may terminate this Agreement on {n} days' written notice; renewal is automatic.",
+    "Scope of Services. The Supplier shall provide the deliverables described in Schedule {n}.",
+    "Confidentiality. Each party shall keep the other's confidential information secret for {n} years.",
+    "Limitation of Liability. Neither party's liability shall exceed {n} times the fees; consequential loss is excluded.",
+    "Indemnity. The Supplier shall indemnify the Customer against third-party claims up to {n} thousand dollars.",
+    "Intellectual Property. All intellectual property in the deliverables vests in the Customer after {n} days.",
+    "Service Levels. The Supplier shall meet {m}% uptime and a response time of {n} hours.",
+    "Governing Law. This Agreement is subject to the governing law and jurisdiction of State {n}.",
+    "Force Majeure. Neither party is liable for delay caused by force majeure lasting under {n} days.",
+)
+_BOILERPLATE_TEMPLATES = (
+    "Headings. Headings in this Agreement are for convenience only and carry no meaning ({n}).",
+    "Counterparts. This Agreement may be executed in {n} counterparts, each an original.",
+    "Notices. Notices shall be sent to the addresses in Part {n} by courier or email.",
+    "Entire Agreement. This document and its {n} schedules form the entire agreement.",
+    "Severability. If any provision ({n}) is held invalid the remainder continues in force.",
+    "Assignment. Neither party may assign this Agreement without consent, save to affiliate {n}.",
+)
+
+# Pipeline stages as imported by main.py, timed by wrapping them there
+_STAGES = ("segment_contract", "initial_analysis", "packed_initial_analysis", "review_round", "arbitration")
+
+
+def make_contract(n_clauses, golden_rate, rng):
+    """A synthetic contract: numbered paragraphs, golden_rate of them golden-clause-like."""
+    clauses = []
+    for i in range(n_clauses):
+        templates = _GOLDEN_TEMPLATES if rng.random() < golden_rate else _BOILERPLATE_TEMPLATES
+        text = rng.choice(templates).format(n=rng.randint(2, 999), m=rng.randint(1, 99))
+        clauses.append(f"{i + 1}. {text}")
+    return "\n\n".join(clauses)
+
+
+def lognormal_latency(median, sigma, scale):
+    """FakeProvider latency: lognormal around median (simulated secs), in real secs."""
+    if median <= 0:
+        return 0.0
+    mu = math.log(median)
+    return lambda rng: rng.lognormvariate(mu, sigma) * scale
+
+
+def _timed(name, fn, durations):
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            durations.setdefault(name, []).append(time.perf_counter() - started)
+    return wrapper
+
+
+def instrument_stages(main_module, durations):
+    """Wrap each stage function in main's namespace to record its duration."""
+    for name in _STAGES:
+        setattr(main_module, name, _timed(name, getattr(main_module, name), durations))
+
+
+def summarise_stages(durations, scale):
+    stages = {}
+    for name, values in durations.items():
+        values = [v / scale for v in values]
+        stages[name] = {
+            "count": len(values),
+            "p50": round(percentile(values, 50), 3),
+            "p95": round(percentile(values, 95), 3),
+            "p99": round(percentile(values, 99), 3),
+            "mean": round(statistics.mean(values), 3),
+        }
+    return stages
+
+
+async def bench_size(n_clauses, args, main_module, fakes, durations):
+    contract = make_contract(n_clauses, args.golden_rate, random.Random(args.seed + n_clauses))
+    durations.clear()
+    calls_before = sum(f.calls for f in fakes.values())
+    errors_before = sum(f.errors for f in fakes.values())
+
+    run_stats = {}
+    tracemalloc.start()
+    started = time.perf_counter()
+    results = await main_module.run_pipeline(contract, run_stats=run_stats)
+    wall = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    calls = sum(f.calls for f in fakes.values()) - calls_before
+    tokens = run_stats["usage"]["total_tokens"]
+    return {
+        "clauses_requested": n_clauses,
+        "clauses": len(results),
+        "wall_secs": round(wall / args.scale, 3),
+        "llm_calls": calls,
+        "llm_calls_per_clause": round(calls / len(results), 3) if results else 0.0,
+        "tokens_per_clause": round(tokens / len(results), 1) if results else 0.0,
+        "provider_errors": sum(f.errors for f in fakes.values()) - errors_before,
+        "council_reviews": run_stats.get("council_reviews", 0),
+        "clause_errors": run_stats.get("errors", 0),
+        "peak_memory_mb": round(peak / (1024 * 1024), 2),
+        "stages": summarise_stages(durations, args.scale),
+    }
+
+
+def print_run(run):
+    print(f"\n{run['clauses']} clauses: wall {run['wall_secs']:.1f}s, "
+          f"{run['llm_calls_per_clause']:.2f} LLM calls/clause ({run['provider_errors']} provider errors), "
+          f"{run['tokens_per_clause']:.0f} tokens/clause, "
+          f"{run['council_reviews']} council reviews, {run['clause_errors']} clause errors, "
+          f"peak memory {run['peak_memory_mb']:.1f} MB")
+    print(f"  {'stage':<26}{'count':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'mean':>9}")
+    for name, s in run["stages"].items():
+        print(f"  {name:<26}{s['count']:>7}{s['p50']:>9.2f}{s['p95']:>9.2f}{s['p99']:>9.2f}{s['mean']:>9.2f}")
+
+
+def compare(runs, baseline, key="clauses_requested"):
+    """Print relative changes against a baseline written by --output, matching runs on key."""
+    def delta(new, old):
+        return f"{(new - old) / old:+.1%}" if old else "n/a"
+
+    previous = {run[key]: run for run in baseline["runs"]}
+    print("\nChange vs baseline (positive = slower / more):")
+    for run in runs:
+        old = previous.get(run[key])
+        if old is None:
+            continue
+        parts = [
+            f"wall {delta(run['wall_secs'], old['wall_secs'])}",
+            f"calls/clause {delta(run['llm_calls_per_clause'], old['llm_calls_per_clause'])}",
+            f"tokens/clause {delta(run['tokens_per_clause'], old.get('tokens_per_clause', 0))}",
+            f"memory {delta(run['peak_memory_mb'], old['peak_memory_mb'])}",
+        ]
+        for name, s in run["stages"].items():
+            if name in old["stages"]:
+                parts.append(f"{name} p95 {delta(s['p95'], old['stages'][name]['p95'])}")
+        print(f"  {run[key]}: " + ", ".join(parts))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="10,50,200,500",
+                        help="comma-separated clause counts of the synthetic contracts")
+    parser.add_argument("--golden-rate", type=float, default=0.5,
+                        help="fraction of clauses resembling a golden clause")
+    parser.add_argument("--latency-median", type=float, default=1.5,
+                        help="median provider latency, simulated seconds")
+    parser.add_argument("--latency-sigma", type=float, default=0.5,
+                        help="lognormal sigma of provider latency")
+    parser.add_argument("--failure-rate", type=float, default=0.02)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.01)
+    parser.add_argument("--disagreement-rate", type=float, default=0.3,
+                        help="chance each model inflates a golden clause's score (drives council review)")
+    parser.add_argument("--scale", type=float, default=0.01,
+                        help="real seconds per simulated second (retry backoff and rate limits are scaled too)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    output = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.compare) if args.compare else None
+
+    # Cache files land in a scratch directory
+    os.chdir(tempfile.mkdtemp(prefix="bench_pipeline_"))
+    import logging
+    logging.disable(logging.WARNING)
+    import main as main_module
+    import models.cache
+    import models.limiter
+    import models.utils
+    import core.verdict_cache
+    from models.fake_model import install_fake_providers
+
+    models.cache.LLM_CACHE_ENABLED = False
+    core.verdict_cache.VERDICT_CACHE_ENABLED = False
+    models.utils.RETRY_BASE_DELAY *= args.scale
+    models.utils.RETRY_MAX_DELAY *= args.scale
+    models.utils.RETRY_AFTER_MAX_SECS *= args.scale
+    # Buckets refill per real second; keep their per-minute limits in simulated time
+    for limiter in models.limiter.LIMITERS.values():
+        limiter.requests.rate /= args.scale
+        limiter.tokens.rate /= args.scale
+        limiter.decrease_interval *= args.scale
+
+    fakes = install_fake_providers(
+        seed=args.seed,
+        throttled=True,
+        latency=lognormal_latency(args.latency_median, args.latency_sigma, args.scale),
+        failure_rate=args.failure_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        disagreement_rate=args.disagreement_rate,
+    )
+    durations = {}
+    instrument_stages(main_module, durations)
+
+    print(f"Simulated providers: latency median {args.latency_median}s (sigma {args.latency_sigma}), "
+          f"failures {args.failure_rate:.0%}, 429s {args.rate_limit_rate:.0%}, "
+          f"disagreement {args.disagreement_rate:.0%}; times and provider rate limits in simulated seconds")
+    runs = []
+    for n_clauses in sizes:
+        run = await bench_size(n_clauses, args, main_module, fakes, durations)
+        runs.append(run)
+        print_run(run)
+
+    if baseline_path:
+        with open(baseline_path, "r") as f:
+            compare(runs, json.load(f))
+    if output:
+        config = {k: v for k, v in vars(args).items() if k not in ("output", "compare")}
+        with open(output, "w") as f:
+            json.dump({"config": config, "runs": runs}, f, indent=2)
+        print(f"\nWrote {output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,126 @@
+"""
+Rerun contracts against a recorded provider corpus, with no API calls.
+
+Record a corpus by running the app (or run_pipeline) with LLM_RECORD_PATH set
+and LLM_CACHE_ENABLED = False, then replay the same contracts here after a
+code change: identical prompts get identical responses, errors and (scaled)
+latencies, so differences in wall time, stage latency and LLM calls per
+clause come from the pipeline itself. Prompts the corpus has never seen
+(e.g. after a prompt edit) are counted as misses.
+
+Usage (from llm_council/):
+    python -m benchmarks.bench_replay recordings/llm_calls.jsonl contract_v1.pdf contract_v2.pdf \\
+        --timing compressed --speedup 20 --output replay_baseline.json
+    python -m benchmarks.bench_replay recordings/llm_calls.jsonl contract_v1.pdf contract_v2.pdf \\
+        --timing compressed --speedup 20 --compare replay_baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from benchmarks.bench_pipeline import instrument_stages, summarise_stages, print_run, compare
+
+
+async def replay_contract(path, main_module, replays, durations, scale):
+    from core.utils import extract_text_from_path
+    contract_text = extract_text_from_path(path, os.path.basename(path))
+    durations.clear()
+    before = {name: (r.calls, r.errors, r.misses) for name, r in replays.items()}
+
+    run_stats = {}
+    tracemalloc.start()
+    started = time.perf_counter()
+    results = await main_module.run_pipeline(contract_text, run_stats=run_stats)
+    wall = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    calls, errors, misses = (
+        sum(getattr(r, field) - before[name][i] for name, r in replays.items())
+        for i, field in enumerate(("calls", "errors", "misses"))
+    )
+    return {
+        "contract": os.path.basename(path),
+        "clauses": len(results),
+        "wall_secs": round(wall / scale, 3),
+        "llm_calls": calls,
+        "llm_calls_per_clause": round(calls / len(results), 3) if results else 0.0,
+        "tokens_per_clause": (
+            round(run_stats["usage"]["total_tokens"] / len(results), 1) if results else 0.0
+        ),
+        "cost_usd": run_stats["usage"]["cost_usd"],
+        "provider_errors": errors,
+        "replay_misses": misses,
+        "council_reviews": run_stats.get("council_reviews", 0),
+        "clause_errors": run_stats.get("errors", 0),
+        "peak_memory_mb": round(peak / (1024 * 1024), 2),
+        "stages": summarise_stages(durations, scale),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("corpus", help="JSONL file written with LLM_RECORD_PATH")
+    parser.add_argument("contracts", nargs="+", help="contract files (.pdf, .docx, .txt)")
+    parser.add_argument("--timing", choices=("faithful", "compressed", "none"), default="compressed")
+    parser.add_argument("--speedup", type=float, default=10.0,
+                        help="latency divisor for --timing compressed (retry backoff is scaled too)")
+    parser.add_argument("--on-miss", choices=("error", "fake"), default="error",
+                        help="unrecorded prompts fail the call, or get a FakeProvider answer")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    args = parser.parse_args()
+    corpus = os.path.abspath(args.corpus)
+    contracts = [os.path.abspath(p) for p in args.contracts]
+    output = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.compare) if args.compare else None
+    # Times are reported in recorded seconds
+    scale = 1 / args.speedup if args.timing == "compressed" else 1.0
+
+    # Cache files land in a scratch directory
+    os.chdir(tempfile.mkdtemp(prefix="bench_replay_"))
+    import logging
+    logging.disable(logging.WARNING)
+    import main as main_module
+    import models.cache
+    import models.utils
+    import core.verdict_cache
+    from models.recording import install_replay_providers
+
+    models.cache.LLM_CACHE_ENABLED = False
+    core.verdict_cache.VERDICT_CACHE_ENABLED = False
+    backoff_scale = 0.0 if args.timing == "none" else scale
+    models.utils.RETRY_BASE_DELAY *= backoff_scale
+    models.utils.RETRY_MAX_DELAY *= backoff_scale
+    models.utils.RETRY_AFTER_MAX_SECS *= backoff_scale
+
+    replays = install_replay_providers(
+        corpus, timing=args.timing, speedup=args.speedup, on_miss=args.on_miss
+    )
+    durations = {}
+    instrument_stages(main_module, durations)
+
+    print(f"Replaying {corpus} ({args.timing} timing"
+          + (f", x{args.speedup:g}" if args.timing == "compressed" else "") + ")")
+    runs = []
+    for path in contracts:
+        run = await replay_contract(path, main_module, replays, durations, scale)
+        runs.append(run)
+        print(f"\n{run['contract']}: {run['replay_misses']} replay misses")
+        print_run(run)
+
+    if baseline_path:
+        with open(baseline_path, "r") as f:
+            compare(runs, json.load(f), key="contract")
+    if output:
+        config = {k: v for k, v in vars(args).items() if k not in ("output", "compare")}
+        with open(output, "w") as f:
+            json.dump({"config": config, "runs": runs}, f, indent=2)
+        print(f"\nWrote {output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+"""
+Fixed batches vs. sliding-window scheduling on a simulated clause workload.
+
+Each simulated clause sleeps for a latency drawn from either the consensus
+path (initial analysis + arbitration) or the council path (initial analysis
++ review + arbitration). No LLM is called.
+
+Usage (from llm_council/):
+    python -m benchmarks.bench_scheduler --clauses 120 --council-rate 0.3
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from core.scheduler import run_bounded
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def make_workload(n_clauses, council_rate, seed):
+    rng = random.Random(seed)
+    workload = []
+    for _ in range(n_clauses):
+        if rng.random() < council_rate:
+            workload.append(rng.lognormvariate(0, 0.3) * 3.0)   # council path
+        else:
+            workload.append(rng.lognormvariate(0, 0.3) * 1.0)   # consensus path
+    return workload
+
+
+async def run_fixed_batches(workload, batch_size, scale):
+    """The previous run_pipeline strategy: gather() over fixed-size batches."""
+    start = time.perf_counter()
+    finished = [0.0] * len(workload)
+
+    async def clause(index, latency):
+        await asyncio.sleep(latency * scale)
+        finished[index] = time.perf_counter() - start
+
+    for i in range(0, len(workload), batch_size):
+        await asyncio.gather(*(
+            clause(i + j, latency) for j, latency in enumerate(workload[i:i + batch_size])
+        ))
+    return time.perf_counter() - start, finished
+
+
+async def run_sliding_window(workload, concurrency, scale):
+    start = time.perf_counter()
+    finished = [0.0] * len(workload)
+
+    async def clause(index, latency):
+        await asyncio.sleep(latency * scale)
+        finished[index] = time.perf_counter() - start
+
+    await run_bounded(workload, clause, concurrency)
+    return time.perf_counter() - start, finished
+
+
+def summarise(name, wall, finished, scale):
+    # Report in simulated seconds so numbers are independent of --scale
+    finished = [f / scale for f in finished]
+    return {
+        "strategy": name,
+        "wall_secs": wall / scale,
+        "p50": percentile(finished, 50),
+        "p95": percentile(finished, 95),
+        "p99": percentile(finished, 99),
+        "mean": statistics.mean(finished),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clauses", type=int, default=120)
+    parser.add_argument("--concurrency", type=int, default=6)
+    parser.add_argument("--council-rate", type=float, default=0.3,
+                        help="fraction of clauses that take the council-review path")
+    parser.add_argument("--scale", type=float, default=0.02,
+                        help="real seconds per simulated second")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    workload = make_workload(args.clauses, args.council_rate, args.seed)
+    rows = [
+        summarise("fixed_batches", *await run_fixed_batches(workload, args.concurrency, args.scale), args.scale),
+        summarise("sliding_window", *await run_sliding_window(workload, args.concurrency, args.scale), args.scale),
+    ]
+
+    print(f"{args.clauses} clauses, concurrency {args.concurrency}, "
+          f"council rate {args.council_rate:.0%} (clause completion time, simulated secs)")
+    print(f"{'strategy':<16}{'wall':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'mean':>9}")
+    for r in rows:
+        print(f"{r['strategy']:<16}{r['wall_secs']:>9.1f}{r['p50']:>9.1f}"
+              f"{r['p95']:>9.1f}{r['p99']:>9.1f}{r['mean']:>9.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,4 +1,18 @@
-SEGMENTATION_PROMPT = """
+import json
+from config.golden_clauses import GOLDEN_CLAUSES
+
+# Every prompt is split into a static PREFIX and a per-call SUFFIX:
+#
+#     prompt = ANALYSIS_PREFIX + ANALYSIS_SUFFIX.format(clause_text=...)
+#
+# The prefixes (instructions plus the Golden Clause Library, rendered once
+# here) are byte-identical on every call, so providers can serve them from
+# their prompt caches. Keep anything that varies per call in the suffixes.
+
+GOLDEN_CLAUSE_LIBRARY = json.dumps(GOLDEN_CLAUSES, indent=2, ensure_ascii=False)
+
+
+_SEGMENTATION_INSTRUCTIONS = """
 You are an expert legal contract parser.
 
 Your task:
@@ -15,13 +29,15 @@ Return strictly valid JSON list:
     "clause_text": "..."
   }}
 ]
+"""
 
+SEGMENTATION_SUFFIX = """
 Contract:
 {contract_text}
 """
 
 
-ANALYSIS_PROMPT = """
+_ANALYSIS_INSTRUCTIONS = """
 You are an expert legal risk analyst.
 
 Golden Clause Library (Authoritative List):
@@ -58,21 +74,68 @@ Return strictly valid JSON and NOTHING ELSE:
   "justification": "...",
   "key_risk_indicators": ["..."]
 }}
+"""
 
+ANALYSIS_SUFFIX = """
 Clause:
 {clause_text}
 """
 
 
 
-REVIEW_PROMPT = """
-You are evaluating multiple anonymized legal risk analyses of the same contract clause.
+_PACKED_ANALYSIS_INSTRUCTIONS = """
+You are an expert legal risk analyst reviewing several contract clauses at once.
 
-Clause:
-{clause_text}
+Golden Clause Library (Authoritative List):
+{golden_clauses}
 
-Anonymized Responses:
-{responses_text}
+IMPORTANT RULES:
+
+1. You MUST only classify a clause as a golden clause if it clearly matches EXACTLY one of the keys in the Golden Clause Library.
+2. You MUST NOT invent new clause types.
+3. If the clause does NOT match one of the listed golden clauses, you MUST set:
+   - "golden_clause_detected": false
+   - "golden_clause_type": null
+4. Do NOT create additional categories such as "Limitation of Liability" unless it exists in the Golden Clause Library.
+5. Only use the clause types exactly as written in the Golden Clause Library.
+6. Analyse EACH clause independently. Do NOT let one clause influence the analysis of another.
+
+Instructions (apply to every clause):
+- Determine if the clause matches one of the listed golden clauses.
+- If yes, identify the type exactly as written.
+- Score legal and commercial risk from 0 to 10.
+- Identify imbalance.
+- Identify key risk phrases.
+- Risk score MUST be a number between 0 and 10.
+- Risk if 0 means No risk.
+- Risk if 10 means Extremely high legal and commercial risk.
+- Do NOT output risk values below 0 or above 10.
+
+Return strictly valid JSON and NOTHING ELSE: a list with exactly one object
+per clause, using the number from the clause's [Clause N] marker as "clause_index":
+
+[
+  {{
+    "clause_index": N,
+    "golden_clause_detected": true/false,
+    "golden_clause_type": Only use clause types exactly as listed in the Golden Clause Library,
+    "risk_score": float (0–10),
+    "balanced": true/false,
+    "justification": "...",
+    "key_risk_indicators": ["..."]
+  }}
+]
+"""
+
+PACKED_ANALYSIS_SUFFIX = """
+Clauses:
+{clauses_text}
+"""
+
+
+_REVIEW_INSTRUCTIONS = """
+You are evaluating multiple anonymized legal risk analyses of the same contract clause.
+The clause and the anonymized responses follow these instructions.
 
 Your task:
 
@@ -119,9 +182,17 @@ Rules:
 - Output ONLY valid JSON.
 """
 
+REVIEW_SUFFIX = """
+Clause:
+{clause_text}
+
+Anonymized Responses:
+{responses_text}
+"""
+
 
 
-ARBITRATION_PROMPT = """
+_ARBITRATION_INSTRUCTIONS = """
 You are the final adjudicator in a legal risk council.
 
 You are given:
@@ -131,6 +202,11 @@ You are given:
 3. Structured reviewer evaluations and rankings.
 4. A predefined Golden Clause Dictionary.
 
+The clause and council data follow these instructions.
+
+Golden Clause Dictionary:
+{golden_clauses}
+
 Your role is to reconcile the analyses and reviews,
 not to conduct a fresh independent review.
 
@@ -241,10 +317,24 @@ Rules:
 - Output only valid JSON.
 - Do not wrap output in code fences.
 - Do not include commentary outside JSON.
+"""
 
+ARBITRATION_SUFFIX = """
 Clause:
 {clause_text}
 
 Council Data:
 {council_data}
 """
+
+
+SEGMENTATION_PREFIX    = _SEGMENTATION_INSTRUCTIONS.format()
+ANALYSIS_PREFIX        = _ANALYSIS_INSTRUCTIONS.format(golden_clauses=GOLDEN_CLAUSE_LIBRARY)
+PACKED_ANALYSIS_PREFIX = _PACKED_ANALYSIS_INSTRUCTIONS.format(golden_clauses=GOLDEN_CLAUSE_LIBRARY)
+REVIEW_PREFIX          = _REVIEW_INSTRUCTIONS.format()
+ARBITRATION_PREFIX     = _ARBITRATION_INSTRUCTIONS.format(golden_clauses=GOLDEN_CLAUSE_LIBRARY)
+
+# Prefixes long enough to be worth an explicit provider cache entry.
+# Anthropic ignores cache markers on prefixes below a model-specific
+# minimum (1024-2048 tokens), so a shorter prefix is just sent uncached.
+CACHEABLE_PREFIXES = (ANALYSIS_PREFIX, PACKED_ANALYSIS_PREFIX, ARBITRATION_PREFIX)
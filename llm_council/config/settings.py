@@ -16,16 +16,156 @@ OPENAI_MODEL = "gpt-4o"
 CLAUDE_MODEL = "claude-3-haiku-20240307"
 GEMINI_MODEL = "gemini-2.5-flash"
 
+# Sampling temperature per provider; None leaves the provider default in place
+OPENAI_TEMPERATURE = 0
+CLAUDE_TEMPERATURE = 0
+GEMINI_TEMPERATURE = None
+
 # Anthropic requires max_tokens (unlike OpenAI/Gemini); set to model max for no practical restriction
 CLAUDE_MAX_TOKENS = 4096
 
 # ─── Disagreement / council threshold ─────────────────────────────────────────
 VARIANCE_THRESHOLD = 1.0
 
+# ─── Initial-analysis quorum ──────────────────────────────────────────────────
+# Once this many models say a clause is NOT golden (and none say it is), the
+# remaining in-flight analysis calls are cancelled. 0 (the default) waits for
+# every model, so a lone dissenting "golden" verdict still reaches review.
+ANALYSIS_QUORUM = 0
+
+# ─── Packed initial analysis ──────────────────────────────────────────────────
+# When enabled, clauses needing initial analysis are packed several to a
+# request per model instead of one request per clause per model. Packs are
+# filled until the estimated tokens (clause text plus expected output) reach
+# PACKED_ANALYSIS_TOKEN_BUDGET; clauses a model leaves out or answers with an
+# invalid result are re-run on their own. The quorum early-exit does not
+# apply to packed requests.
+PACKED_ANALYSIS              = False
+PACKED_ANALYSIS_TOKEN_BUDGET    = 4000   # per pack: clause text + expected output
+PACKED_ANALYSIS_MAX_CLAUSES     = 8      # 8 x 300 output tokens stays under CLAUDE_MAX_TOKENS
+PACKED_OUTPUT_TOKENS_PER_CLAUSE = 300
+
 # ─── Retry settings ───────────────────────────────────────────────────────────
-MAX_RETRIES       = 2        # number of retries after the first attempt
-RETRY_BASE_DELAY  = 1.0      # seconds; actual wait = RETRY_BASE_DELAY * 2^attempt
+MAX_RETRIES          = 2        # number of retries after the first attempt
+RETRY_BASE_DELAY     = 1.0      # seconds; wait is uniform in [0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2^attempt)]
+RETRY_MAX_DELAY      = 30.0     # cap on a single jittered backoff
+RETRY_AFTER_MAX_SECS = 60.0     # longest server-requested Retry-After we will honour
+
+# ─── Circuit breaker (per provider) ───────────────────────────────────────────
+BREAKER_FAILURE_THRESHOLD  = 5     # consecutive transient failures before the circuit opens
+BREAKER_RESET_TIMEOUT_SECS = 30    # how long an open circuit fails fast before a probe call
+
+# ─── Local golden-clause pre-filter ────────────────────────────────────────────
+# TF-IDF similarity against the Golden Clause Library, computed locally
+# before initial analysis. Clauses scoring below the threshold are treated
+# as not golden without any LLM call.
+#   "off"    – never consulted
+#   "shadow" – scored and compared with the LLM verdict, but never skips calls
+#   "active" – clauses below the threshold skip the council entirely
+PREFILTER_MODE      = "shadow"
+PREFILTER_THRESHOLD = 0.05
+
+# ─── Segmentation windows ─────────────────────────────────────────────────────
+# Long contracts are pre-split locally on heading/numbering boundaries into
+# overlapping windows that are segmented concurrently and stitched back.
+SEGMENTATION_WINDOW_CHARS         = 12000   # contracts shorter than this use a single call
+SEGMENTATION_WINDOW_OVERLAP_CHARS = 1500    # text repeated between neighbouring windows
+SEGMENTATION_MAX_CONCURRENCY      = 4       # windows segmented in parallel
+
+# ─── Provider rate limits ─────────────────────────────────────────────────────
+# Shared by every call in the process (analysis, review, arbitration,
+# segmentation). Set rpm/tpm to your account tier; concurrency adapts between
+# 1 and max_concurrency (AIMD: halves on 429, grows while calls succeed).
+PROVIDER_LIMITS = {
+    "openai": {"rpm": 500,  "tpm": 450_000,   "max_concurrency": 16},
+    "claude": {"rpm": 50,   "tpm": 50_000,    "max_concurrency": 8},
+    "gemini": {"rpm": 1000, "tpm": 1_000_000, "max_concurrency": 16},
+}
+LIMITER_OUTPUT_TOKEN_ESTIMATE = 800   # expected output tokens per call, added to the prompt estimate
+
+# ─── Token pricing and budget ─────────────────────────────────────────────────
+# USD per million tokens, by model name, used to cost the usage each provider
+# reports. "cached_input" applies to prompt tokens served from the provider's
+# prompt cache and "cache_write" to tokens written to it (Anthropic); both
+# default to "input". Models missing from the table are costed at 0.
+MODEL_PRICES = {
+    "gpt-4o":                  {"input": 2.50, "cached_input": 1.25, "output": 10.00},
+    "claude-3-haiku-20240307": {"input": 0.25, "cached_input": 0.03, "cache_write": 0.30, "output": 1.25},
+    "gemini-2.5-flash":        {"input": 0.30, "cached_input": 0.075, "output": 2.50},
+}
+# Optional cap on the tokens (input + output) one contract may use; None = no cap.
+# Once less than CONTRACT_TOKEN_RESERVE of it is left, disagreements go straight
+# to arbitration without a council review; once it is spent, the remaining
+# clauses are not analysed. Calls already in flight still complete.
+CONTRACT_TOKEN_BUDGET  = None
+CONTRACT_TOKEN_RESERVE = 0.25
+
+# ─── Clause scheduling ────────────────────────────────────────────────────────
+CLAUSE_CONCURRENCY   = 6    # clauses kept in flight at all times (sliding window)
+CLAUSE_START_RATE    = 0    # max clause starts per second, 0 = unlimited; lower to ~1.0 if you hit 429 errors
+
+# ─── Provider call recording ──────────────────────────────────────────────────
+# Path of a JSONL file to append every provider call to (prompt hash, latency,
+# response or error), for offline replay with models.recording.ReplayProvider.
+# None disables recording.
+LLM_RECORD_PATH = None
+
+# ─── LLM response cache ───────────────────────────────────────────────────────
+# Raw model responses are cached on disk keyed by provider, model name,
+# temperature and a hash of the rendered prompt, so replays cost nothing.
+LLM_CACHE_ENABLED     = True
+LLM_CACHE_PATH        = "cache/llm_responses.sqlite3"
+LLM_CACHE_MAX_BYTES   = 256 * 1024 * 1024   # LRU eviction once stored responses exceed this
+LLM_CACHE_TTL_SECS    = 7 * 24 * 3600       # entries older than this are treated as misses
+
+# ─── Clause verdict cache ─────────────────────────────────────────────────────
+# Final per-clause verdicts keyed on normalised clause text plus a fingerprint
+# of GOLDEN_CLAUSES, the prompt templates and the council settings. Boilerplate
+# clauses seen before skip the whole council.
+VERDICT_CACHE_ENABLED   = True
+VERDICT_CACHE_PATH      = "cache/clause_verdicts.sqlite3"
+VERDICT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+VERDICT_CACHE_TTL_SECS  = 30 * 24 * 3600
+
+# ─── Whole-contract cache ─────────────────────────────────────────────────────
+# Re-uploading a file that was already analysed under the same pipeline
+# fingerprint (models, prompts, golden clauses, thresholds) returns the stored
+# report instead of re-running the pipeline; /analyze?force=true bypasses it.
+# Deleting the report drops its entry.
+CONTRACT_CACHE_ENABLED = True
+
+# ─── Revision mode ────────────────────────────────────────────────────────────
+# /analyze?parent_report_id=... aligns the new clauses with the parent
+# report's. Identical clauses (after folding case, whitespace and numbering)
+# keep the parent's verdict; others are paired as "modified" when their
+# similarity reaches this threshold, and re-analysed either way.
+REVISION_MATCH_THRESHOLD = 0.6
+
+# ─── Document extraction ──────────────────────────────────────────────────────
+# PDFs are extracted off the event loop in a process pool, in ranges of
+# EXTRACTION_PAGES_PER_TASK pages. A range that takes longer than
+# EXTRACTION_PAGE_TIMEOUT_SECS per page is skipped; PDFs with more than
+# EXTRACTION_MAX_PAGES pages are rejected.
+EXTRACTION_WORKERS           = 2
+EXTRACTION_PAGES_PER_TASK    = 16
+EXTRACTION_PAGE_TIMEOUT_SECS = 10.0
+EXTRACTION_MAX_PAGES         = 500
+# PDF text backend: "pdfium" (fast), "pdfplumber" (slower, better on odd
+# layouts) or "auto" (pdfium, falling back to pdfplumber per page when the
+# pdfium output looks poor).
+PDF_BACKEND = "auto"
+
+# ─── Report store ─────────────────────────────────────────────────────────────
+# Per-report summary rows (risk level, clause counts) that back the report
+# listing and dashboard; full report bodies stay in the reports/ directory.
+REPORT_INDEX_PATH = "reports_index.sqlite3"
+# Report bodies are stored compressed: "auto" uses zstd when the zstandard
+# package is installed and gzip otherwise. Existing reports keep their codec.
+REPORT_COMPRESSION = "auto"
 
-# ─── Batching settings ────────────────────────────────────────────────────────
-BATCH_SIZE              = 6    # clauses processed concurrently per batch
-INTER_BATCH_DELAY_SECS  = 0    # seconds between batches; raise to ~1.0 if you hit 429 errors
+# ─── Background jobs ──────────────────────────────────────────────────────────
+# POST /jobs queues an analysis in a local SQLite queue drained by async workers
+JOB_QUEUE_PATH    = "jobs/jobs.sqlite3"
+JOB_UPLOADS_DIR   = "jobs/uploads"   # uploads waiting to be processed
+JOB_WORKERS       = 2                # contracts analysed concurrently in the background
+JOB_MAX_ATTEMPTS  = 3                # restarts tolerated before an interrupted job is failed
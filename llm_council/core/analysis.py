@@ -1,30 +1,117 @@
 import asyncio
 import logging
 from models.registry import get_active_models, API_KEY_MAP
-from config.prompts import ANALYSIS_PROMPT
-from config.golden_clauses import GOLDEN_CLAUSES
-from core.schemas import AnalysisOutput
+from config.prompts import (
+    ANALYSIS_PREFIX, ANALYSIS_SUFFIX, PACKED_ANALYSIS_PREFIX, PACKED_ANALYSIS_SUFFIX,
+)
+from core.schemas import AnalysisOutput, PackedAnalysisItem
 from models.utils import safe_llm_call
+from models.breaker import CircuitOpenError
+from config.settings import (
+    ANALYSIS_QUORUM, PACKED_ANALYSIS_TOKEN_BUDGET, PACKED_ANALYSIS_MAX_CLAUSES,
+    PACKED_OUTPUT_TOKENS_PER_CLAUSE,
+)
+from core.run_stats import bump
 
 
-async def initial_analysis(clause_text):
+# Smoothed per-provider analysis latency, used to estimate the time a
+# quorum early-exit saves by cancelling the slower calls.
+_latency_ewma = {}
+_EWMA_ALPHA = 0.2
 
-    prompt = ANALYSIS_PROMPT.format(
-        clause_text=clause_text,
-        golden_clauses=GOLDEN_CLAUSES
-    )
+
+def _record_latency(name, secs):
+    prev = _latency_ewma.get(name)
+    _latency_ewma[name] = secs if prev is None else prev + _EWMA_ALPHA * (secs - prev)
+
+
+def _record_latency_lower_bound(name, secs):
+    """
+    A call cancelled after secs would have taken at least that long. The
+    slow providers are the ones cancelled, so without this their estimate
+    would only move on the rare calls they finish.
+    """
+    prev = _latency_ewma.get(name)
+    if prev is None or prev < secs:
+        _record_latency(name, secs)
+
+
+def _not_golden(result):
+    return result is not None and not result.get("golden_clause_detected", False)
+
+
+async def initial_analysis(clause_text, run_stats=None):
+    """
+    Run every active model on the clause in parallel.
+
+    Returns {model_name: AnalysisOutput dict or None}. With ANALYSIS_QUORUM
+    set, as soon as that many models say the clause is not golden (and none
+    says it is) the remaining calls are cancelled and left out of the result;
+    run_stats then records "quorum_exits" and "quorum_secs_saved" (a lower
+    bound: the latency of calls that are usually cancelled is only known to
+    exceed the time they ran for).
+    """
+    prompt = ANALYSIS_PREFIX + ANALYSIS_SUFFIX.format(clause_text=clause_text)
 
     active_models = get_active_models()
+    loop = asyncio.get_running_loop()
+    started = loop.time()
 
     async def run_model(name, fn):
         api_key = API_KEY_MAP[name]()
-        result = await safe_llm_call(lambda p: fn(p, api_key=api_key), prompt, AnalysisOutput)
-        return name, result
+        try:
+            result = await safe_llm_call(
+                lambda p: fn(p, api_key=api_key), prompt, AnalysisOutput, provider=name
+            )
+        except CircuitOpenError as e:
+            # Provider is known to be down: carry on with the remaining models
+            logging.warning(str(e))
+            result = None
+        _record_latency(name, loop.time() - started)
+        return result
+
+    tasks = {
+        asyncio.create_task(run_model(name, fn)): name
+        for name, fn in active_models.items()
+    }
+    completed = {}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                completed[tasks[task]] = task.result()   # re-raises model errors
 
-    tasks = [run_model(name, fn) for name, fn in active_models.items()]
-    batch_results = await asyncio.gather(*tasks)
+            values = completed.values()
+            if (
+                pending
+                and ANALYSIS_QUORUM
+                and sum(_not_golden(v) for v in values) >= ANALYSIS_QUORUM
+                and not any(v and v.get("golden_clause_detected") for v in values)
+            ):
+                elapsed = loop.time() - started
+                cancelled = [tasks[t] for t in pending]
+                saved = max(
+                    (max(0.0, _latency_ewma.get(n, elapsed) - elapsed) for n in cancelled),
+                    default=0.0
+                )
+                for name in cancelled:
+                    _record_latency_lower_bound(name, elapsed)
+                bump(run_stats, "quorum_exits")
+                bump(run_stats, "quorum_secs_saved", saved)
+                logging.info(
+                    f"Analysis quorum reached (not golden) after {elapsed:.1f}s; "
+                    f"cancelled {', '.join(cancelled)} (>= {saved:.1f}s saved)."
+                )
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
 
-    results = {name: result for name, result in batch_results}
+    # Keep registry order so downstream anonymisation labels stay stable
+    results = {name: completed[name] for name in active_models if name in completed}
 
     # Warn if any model failed to respond
     for name, result in results.items():
@@ -32,3 +119,103 @@ async def initial_analysis(clause_text):
             logging.warning(f"Model '{name}' returned no result during initial analysis.")
 
     return results
+
+
+def pack_clauses(clause_texts, token_budget=PACKED_ANALYSIS_TOKEN_BUDGET,
+                 max_clauses=PACKED_ANALYSIS_MAX_CLAUSES):
+    """
+    Group clauses into consecutive packs for packed analysis.
+
+    Returns a list of packs, each a list of indices into clause_texts, whose
+    estimated tokens (~4 characters per token plus the expected output per
+    clause) stay within token_budget. A clause over budget gets its own pack.
+    """
+    packs, current, used = [], [], 0
+    for index, text in enumerate(clause_texts):
+        cost = len(text) // 4 + PACKED_OUTPUT_TOKENS_PER_CLAUSE
+        if current and (used + cost > token_budget or len(current) >= max_clauses):
+            packs.append(current)
+            current, used = [], 0
+        current.append(index)
+        used += cost
+    if current:
+        packs.append(current)
+    return packs
+
+
+async def packed_initial_analysis(clause_texts, run_stats=None):
+    """
+    Run every active model on a pack of clauses, one request per model.
+
+    Returns a list aligned with clause_texts, each entry shaped like the
+    result of initial_analysis: {model_name: AnalysisOutput dict or None}.
+    Clauses a model leaves out or answers invalidly are re-run on their own
+    with the single-clause prompt. run_stats records "packed_calls" and
+    "packed_fallbacks".
+    """
+    clauses_text = "\n\n".join(
+        f"[Clause {i + 1}]\n{text}" for i, text in enumerate(clause_texts)
+    )
+    prompt = PACKED_ANALYSIS_PREFIX + PACKED_ANALYSIS_SUFFIX.format(clauses_text=clauses_text)
+
+    active_models = get_active_models()
+
+    async def run_single(name, call, clause_text):
+        single_prompt = ANALYSIS_PREFIX + ANALYSIS_SUFFIX.format(clause_text=clause_text)
+        try:
+            return await safe_llm_call(call, single_prompt, AnalysisOutput, provider=name)
+        except Exception as e:
+            logging.warning(f"Single-clause analysis by '{name}' failed: {e}")
+            return None
+
+    async def run_model(name, fn):
+        api_key = API_KEY_MAP[name]()
+        call = lambda p: fn(p, api_key=api_key)
+        outputs = [None] * len(clause_texts)
+
+        try:
+            raw = await safe_llm_call(call, prompt, provider=name)
+            bump(run_stats, "packed_calls")
+        except CircuitOpenError as e:
+            logging.warning(str(e))
+            return outputs
+        except Exception as e:
+            logging.warning(f"Packed analysis by '{name}' failed: {e}")
+            raw = []
+
+        for item in raw if isinstance(raw, list) else []:
+            try:
+                parsed = PackedAnalysisItem(**item).model_dump()
+            except Exception as e:
+                logging.warning(f"Discarding invalid packed result from '{name}': {e}")
+                continue
+            index = parsed.pop("clause_index") - 1
+            if 0 <= index < len(outputs) and outputs[index] is None:
+                outputs[index] = parsed
+
+        missing = [i for i, output in enumerate(outputs) if output is None]
+        if missing:
+            bump(run_stats, "packed_fallbacks", len(missing))
+            logging.info(
+                f"Packed analysis by '{name}' missed {len(missing)}/{len(outputs)} "
+                f"clause(s); retrying them individually."
+            )
+            singles = await asyncio.gather(*(
+                run_single(name, call, clause_texts[i]) for i in missing
+            ))
+            for i, output in zip(missing, singles):
+                outputs[i] = output
+        return outputs
+
+    per_model = await asyncio.gather(*(
+        run_model(name, fn) for name, fn in active_models.items()
+    ))
+
+    results = []
+    for index in range(len(clause_texts)):
+        result = {name: outputs[index] for name, outputs in zip(active_models, per_model)}
+        for name, output in result.items():
+            if output is None:
+                logging.warning(f"Model '{name}' returned no result for packed clause {index + 1}.")
+        results.append(result)
+    return results
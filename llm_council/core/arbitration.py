@@ -1,6 +1,6 @@
 import os
 import json
-from config.prompts import ARBITRATION_PROMPT
+from config.prompts import ARBITRATION_PREFIX, ARBITRATION_SUFFIX
 from config.settings import ARBITRATOR_MODEL
 from core.schemas import ArbitrationOutput
 from models.registry import MODEL_REGISTRY, API_KEY_MAP
@@ -18,7 +18,7 @@ async def arbitration(clause_text, council_data):
         "reviews":   {...}
     }
     """
-    prompt = ARBITRATION_PROMPT.format(
+    prompt = ARBITRATION_PREFIX + ARBITRATION_SUFFIX.format(
         clause_text=clause_text,
         council_data=json.dumps(council_data, indent=2)
     )
@@ -29,7 +29,8 @@ async def arbitration(clause_text, council_data):
     validated = await safe_llm_call(
         lambda p: arbitrator_fn(p, api_key=api_key),
         prompt,
-        ArbitrationOutput
+        ArbitrationOutput,
+        provider=ARBITRATOR_MODEL
     )
 
     return validated
@@ -0,0 +1,113 @@
+import zlib
+
+try:
+    import zstandard
+except ImportError:   # optional: gzip is used when zstandard is not installed
+    zstandard = None
+
+# codec name -> (file extension, HTTP Content-Encoding token)
+CODECS = {
+    "gzip": (".gz", "gzip"),
+    "zstd": (".zst", "zstd"),
+}
+
+_GZIP_LEVEL = 6
+_ZSTD_LEVEL = 6
+
+
+def resolve_codec(setting):
+    """Codec to write with for a REPORT_COMPRESSION setting ("auto", "gzip" or "zstd")."""
+    if setting == "auto":
+        return "zstd" if zstandard is not None else "gzip"
+    if setting not in CODECS:
+        raise ValueError(f"Unknown compression codec: {setting}")
+    if setting == "zstd" and zstandard is None:
+        raise ValueError("REPORT_COMPRESSION is 'zstd' but the zstandard package is not installed")
+    return setting
+
+
+class SegmentedCompressor:
+    """
+    Build one compressed stream out of segments that can each be
+    decompressed on their own, given the byte range add() returned.
+
+    gzip: a single standard gzip member with a full flush (byte-aligned,
+          dictionary reset) after every segment, so a segment is a raw
+          deflate run.
+    zstd: one zstd frame per segment; concatenated frames are themselves a
+          valid zstd stream.
+
+    Either way the whole file stays a normal .gz / .zst that any client can
+    decode, e.g. via HTTP Content-Encoding.
+    """
+
+    def __init__(self, codec):
+        self.codec = codec
+        self._chunks = []
+        self._size = 0
+        if codec == "gzip":
+            self._deflate = zlib.compressobj(_GZIP_LEVEL, zlib.DEFLATED, 31)
+            # Write the gzip header now so the first segment starts on a clean boundary
+            self._emit(self._deflate.flush(zlib.Z_FULL_FLUSH))
+        else:
+            self._zstd = zstandard.ZstdCompressor(level=_ZSTD_LEVEL)
+
+    def _emit(self, data):
+        self._chunks.append(data)
+        self._size += len(data)
+
+    def add(self, data):
+        """Append one segment; returns its (start, end) compressed byte range."""
+        start = self._size
+        if self.codec == "gzip":
+            self._emit(self._deflate.compress(data))
+            self._emit(self._deflate.flush(zlib.Z_FULL_FLUSH))
+        else:
+            self._emit(self._zstd.compress(data))
+        return start, self._size
+
+    def finish(self):
+        if self.codec == "gzip":
+            self._emit(self._deflate.flush())
+        return b"".join(self._chunks)
+
+
+def compress(codec, data):
+    compressor = SegmentedCompressor(codec)
+    compressor.add(data)
+    return compressor.finish()
+
+
+def decompress_segment(codec, data):
+    """Decompress one segment's bytes, as delimited by SegmentedCompressor.add()."""
+    if codec == "gzip":
+        return zlib.decompressobj(-15).decompress(data)
+    return _zstd_module().ZstdDecompressor().decompress(data)
+
+
+def iter_decompress(codec, f, chunk_size=64 * 1024):
+    """Yield the decompressed content of a whole compressed file object, chunk by chunk."""
+    if codec == "gzip":
+        inflater = zlib.decompressobj(31)
+        while chunk := f.read(chunk_size):
+            yield inflater.decompress(chunk)
+        yield inflater.flush()
+    else:
+        reader = _zstd_module().ZstdDecompressor().stream_reader(f, read_across_frames=True)
+        while chunk := reader.read(chunk_size):
+            yield chunk
+
+
+def iter_decompress_file(codec, path):
+    with open(path, "rb") as f:
+        yield from iter_decompress(codec, f)
+
+
+def decompress_file(codec, path):
+    return b"".join(iter_decompress_file(codec, path))
+
+
+def _zstd_module():
+    if zstandard is None:
+        raise RuntimeError("This report is zstd-compressed but zstandard is not installed")
+    return zstandard
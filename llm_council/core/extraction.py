@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from core.metrics import STAGE_SECONDS
+from core.utils import extract_text_from_path, extract_pdf_pages, pdf_page_count
+
+
+class ExtractionError(ValueError):
+    """The document cannot be turned into text."""
+
+
+class TooManyPagesError(ExtractionError):
+    """The PDF has more pages than the configured cap."""
+
+
+# ─── Process-pool workers (module level so they can be pickled) ──────────────
+
+def _extract_pdf_pages(path, start, end, backend):
+    """Pages [start, end) of the PDF at path: (texts, fallback pages, seconds taken)."""
+    started = time.perf_counter()
+    texts, fallbacks = extract_pdf_pages(path, start, end, backend=backend)
+    return texts, fallbacks, time.perf_counter() - started
+
+
+class ExtractionService:
+    """
+    Document text extraction that keeps the event loop free.
+
+    PDFs are split into ranges of pages_per_task pages, each extracted from
+    the file on disk by a process-pool worker, then reassembled in page
+    order. Each range gets page_timeout seconds per page once it is running;
+    pages of a range that times out are skipped. The pool is then retired:
+    later work goes to a fresh pool, and once the other ranges running on
+    the old one have finished or timed out, its processes (the stuck worker
+    among them) are terminated. Other formats are parsed in a thread.
+    """
+
+    def __init__(self, workers=2, pages_per_task=16, page_timeout=10.0, max_pages=500,
+                 backend="auto"):
+        self.workers = workers
+        self.pages_per_task = pages_per_task
+        self.page_timeout = page_timeout
+        self.max_pages = max_pages
+        self.backend = backend
+        self._pool = None
+        self._running = {}   # pool -> futures of the calls running on it
+        self._retiring = set()
+        # Submit at most one call per worker so timeouts measure extraction, not queueing
+        self._slots = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            self._running[self._pool] = set()
+        return self._pool
+
+    @staticmethod
+    def _terminate(pool):
+        # Only the executor knows its worker processes; shutdown() alone
+        # would leave a stuck one running
+        processes = list((getattr(pool, "_processes", None) or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    async def _retire_pool(self, pool):
+        if self._pool is pool:
+            self._pool = None
+        others = set(self._running.get(pool, ()))
+        if others:
+            # Ranges of other documents on this pool finish or hit their own timeout
+            await asyncio.gather(*others, return_exceptions=True)
+        if self._running.pop(pool, None) is not None:
+            self._terminate(pool)
+
+    async def _run_in_pool(self, timeout, fn, *args):
+        """Run fn(*args) in a pool worker, retiring the pool if it exceeds timeout."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        async with self._slots:
+            pool = self._get_pool()
+            future = asyncio.wrap_future(pool.submit(fn, *args))
+            self._running[pool].add(future)
+            try:
+                return await asyncio.wait_for(future, timeout=timeout)
+            except asyncio.TimeoutError:
+                self._running.get(pool, set()).discard(future)
+                task = asyncio.ensure_future(self._retire_pool(pool))
+                self._retiring.add(task)
+                task.add_done_callback(self._retiring.discard)
+                raise
+            finally:
+                if pool in self._running:
+                    self._running[pool].discard(future)
+
+    def shutdown(self):
+        for pool in list(self._running):
+            self._terminate(pool)
+        self._running.clear()
+        self._pool = None
+
+    async def extract(self, path, filename):
+        """
+        Extract the text of an uploaded document saved at path.
+
+        Returns (text, stats) where stats records the method, page counts
+        and timings. Raises ExtractionError / TooManyPagesError.
+        """
+        started = time.perf_counter()
+        ext = filename.split(".")[-1].lower()
+        if ext == "pdf":
+            text, stats = await self._extract_pdf(path)
+        else:
+            text = await asyncio.to_thread(extract_text_from_path, path, filename)
+            stats = {"method": ext if ext == "docx" else "text"}
+        secs = time.perf_counter() - started
+        STAGE_SECONDS.labels("extraction").observe(secs)
+        stats["secs"] = round(secs, 3)
+        logging.info(f"Extracted text from {filename} in {stats['secs']:.2f}s ({stats}).")
+        return text, stats
+
+    async def _extract_pdf(self, path):
+        try:
+            n_pages = await self._run_in_pool(self.page_timeout, pdf_page_count, path)
+        except asyncio.TimeoutError:
+            raise ExtractionError("Could not read PDF: timed out counting its pages")
+        except Exception as e:
+            raise ExtractionError(f"Could not read PDF: {e}")
+        if n_pages > self.max_pages:
+            raise TooManyPagesError(
+                f"PDF has {n_pages} pages; the maximum is {self.max_pages}."
+            )
+
+        ranges = [
+            (start, min(start + self.pages_per_task, n_pages))
+            for start in range(0, n_pages, self.pages_per_task)
+        ]
+        outcomes = await asyncio.gather(
+            *(
+                self._run_in_pool(
+                    self.page_timeout * (end - start),
+                    _extract_pdf_pages, path, start, end, self.backend,
+                )
+                for start, end in ranges
+            ),
+            return_exceptions=True,
+        )
+
+        page_texts = []
+        task_secs = []
+        fallback_pages = []
+        skipped = []
+        for (start, end), outcome in zip(ranges, outcomes):
+            if isinstance(outcome, BaseException):
+                if isinstance(outcome, asyncio.TimeoutError):
+                    logging.warning(f"PDF pages {start + 1}-{end} timed out; skipping them.")
+                else:
+                    logging.warning(f"PDF pages {start + 1}-{end} failed ({outcome}); skipping them.")
+                skipped.extend(range(start + 1, end + 1))
+                page_texts.extend([""] * (end - start))
+                continue
+            texts, fallbacks, secs = outcome
+            page_texts.extend(texts)
+            fallback_pages.extend(page + 1 for page in fallbacks)
+            task_secs.append(round(secs, 3))
+
+        text = "".join(t + "\n" for t in page_texts if t)
+        return text, {
+            "method": "pdf",
+            "backend": self.backend,
+            "pages": n_pages,
+            "tasks": len(ranges),
+            "workers": self.workers,
+            "task_secs": task_secs,
+            "fallback_pages": fallback_pages,
+            "skipped_pages": skipped,
+        }
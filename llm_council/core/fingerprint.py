@@ -0,0 +1,65 @@
+import hashlib
+import json
+from config import prompts
+from config.golden_clauses import GOLDEN_CLAUSES
+from config.settings import (
+    OPENAI_MODEL, CLAUDE_MODEL, GEMINI_MODEL,
+    OPENAI_TEMPERATURE, CLAUDE_TEMPERATURE, GEMINI_TEMPERATURE,
+    AVAILABLE_MODELS, ARBITRATOR_MODEL, VARIANCE_THRESHOLD,
+    SEGMENTATION_MODEL, CLAUDE_MAX_TOKENS, ANALYSIS_QUORUM,
+    PACKED_ANALYSIS, PACKED_ANALYSIS_TOKEN_BUDGET, PACKED_ANALYSIS_MAX_CLAUSES,
+    PREFILTER_MODE, PREFILTER_THRESHOLD,
+    SEGMENTATION_WINDOW_CHARS, SEGMENTATION_WINDOW_OVERLAP_CHARS, PDF_BACKEND,
+    CONTRACT_TOKEN_BUDGET, CONTRACT_TOKEN_RESERVE,
+)
+
+
+def _digest(payload) -> str:
+    blob = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+
+def council_fingerprint() -> str:
+    """
+    Fingerprint of everything that shapes a clause verdict: the Golden Clause
+    Library, every prompt template and the council's model, threshold,
+    quorum and packing settings.
+    Any edit to these changes the fingerprint and so invalidates cached verdicts.
+    """
+    templates = {
+        name: value
+        for name, value in vars(prompts).items()
+        if name.isupper() and isinstance(value, str)
+    }
+    return _digest({
+        "golden_clauses": GOLDEN_CLAUSES,
+        "prompts": templates,
+        "models": [OPENAI_MODEL, CLAUDE_MODEL, GEMINI_MODEL],
+        "temperatures": [OPENAI_TEMPERATURE, CLAUDE_TEMPERATURE, GEMINI_TEMPERATURE],
+        "available_models": AVAILABLE_MODELS,
+        "arbitrator": ARBITRATOR_MODEL,
+        "variance_threshold": VARIANCE_THRESHOLD,
+        # Verdicts settled by a quorum exit or a packed call are cached too
+        "analysis_quorum": ANALYSIS_QUORUM,
+        "packed_analysis": [
+            PACKED_ANALYSIS, PACKED_ANALYSIS_TOKEN_BUDGET, PACKED_ANALYSIS_MAX_CLAUSES,
+        ],
+    })
+
+
+def pipeline_fingerprint() -> str:
+    """
+    Fingerprint of everything that shapes a whole-contract report: the
+    council fingerprint plus text extraction, segmentation and the settings
+    that decide which clauses reach the council and how.
+    """
+    return _digest({
+        "council": council_fingerprint(),
+        "pdf_backend": PDF_BACKEND,
+        "segmentation": [
+            SEGMENTATION_MODEL, SEGMENTATION_WINDOW_CHARS, SEGMENTATION_WINDOW_OVERLAP_CHARS,
+        ],
+        "claude_max_tokens": CLAUDE_MAX_TOKENS,
+        "prefilter": [PREFILTER_MODE, PREFILTER_THRESHOLD],
+        "token_budget": [CONTRACT_TOKEN_BUDGET, CONTRACT_TOKEN_RESERVE],
+    })
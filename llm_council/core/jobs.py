@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+# Job lifecycle: queued -> running -> completed | failed
+QUEUED, RUNNING, COMPLETED, FAILED = "queued", "running", "completed", "failed"
+
+
+def remove_upload(path):
+    """Delete a job's saved upload; failed jobs are never retried, so nothing needs it."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class JobQueue:
+    """
+    Durable FIFO of contract-analysis jobs backed by a local SQLite file.
+
+    Jobs survive process restarts: anything left in 'running' when the
+    process died is put back to 'queued' by requeue_interrupted().
+
+    Every method does blocking SQLite I/O; call them from async code through
+    asyncio.to_thread.
+    """
+
+    def __init__(self, path, max_attempts=3):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, filename TEXT NOT NULL, "
+                "ext TEXT NOT NULL, upload_path TEXT NOT NULL, "
+                "created_at REAL NOT NULL, started_at REAL, finished_at REAL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, "
+                "clauses_done INTEGER NOT NULL DEFAULT 0, clauses_total INTEGER, "
+                "report_id TEXT, error TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            self._connect().execute(sql, params)
+
+    def _fetchone(self, sql, params=()):
+        # Rows are fetched under the lock: the connection is shared between threads
+        with self._lock:
+            return self._connect().execute(sql, params).fetchone()
+
+    def submit(self, filename, ext, upload_path):
+        """Enqueue a job for an already-saved upload; returns the job id."""
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, status, filename, ext, upload_path, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, QUEUED, filename, ext, upload_path, time.time())
+        )
+        return job_id
+
+    def claim_next(self):
+        """Atomically move the oldest queued job to running and return it."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1, "
+                    "clauses_done = 0, clauses_total = NULL WHERE id = ?",
+                    (RUNNING, time.time(), row["id"])
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        job = dict(row)
+        job["status"] = RUNNING
+        job["attempts"] += 1
+        return job
+
+    def update_progress(self, job_id, done, total):
+        self._execute(
+            "UPDATE jobs SET clauses_done = ?, clauses_total = ? WHERE id = ?",
+            (done, total, job_id)
+        )
+
+    def complete(self, job_id, report_id):
+        self._execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, report_id = ?, error = NULL WHERE id = ?",
+            (COMPLETED, time.time(), report_id, job_id)
+        )
+
+    def fail(self, job_id, error):
+        self._execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+            (FAILED, time.time(), str(error), job_id)
+        )
+
+    def get(self, job_id):
+        row = self._fetchone("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return dict(row) if row else None
+
+    def requeue_interrupted(self):
+        """
+        Return jobs stuck in 'running' (the process died mid-run) to the
+        queue. Jobs that have already used max_attempts are failed instead
+        so a contract that crashes the worker cannot loop forever.
+        """
+        with self._lock:
+            conn = self._connect()
+            exhausted = conn.execute(
+                "SELECT upload_path FROM jobs WHERE status = ? AND attempts >= ?",
+                (RUNNING, self.max_attempts)
+            ).fetchall()
+            failed = conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = ? "
+                "WHERE status = ? AND attempts >= ?",
+                (FAILED, time.time(), "Interrupted too many times", RUNNING, self.max_attempts)
+            ).rowcount
+            requeued = conn.execute(
+                "UPDATE jobs SET status = ? WHERE status = ?", (QUEUED, RUNNING)
+            ).rowcount
+        for row in exhausted:
+            remove_upload(row["upload_path"])
+        if requeued or failed:
+            logging.warning(
+                f"Job queue: re-queued {requeued} interrupted job(s), "
+                f"failed {failed} that exceeded {self.max_attempts} attempts."
+            )
+        return requeued
+
+
+class JobWorkerPool:
+    """
+    Pool of asyncio workers that drain a JobQueue.
+
+    handler(job, report_progress) must return the report id of the saved
+    analysis; report_progress(done, total) is a coroutine function to await
+    as clauses finish. The upload of a failed job is deleted.
+    """
+
+    def __init__(self, queue, handler, n_workers=2, poll_interval=2.0):
+        self.queue = queue
+        self.handler = handler
+        self.n_workers = n_workers
+        self.poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._tasks = []
+
+    def start(self):
+        # Startup, before any request is served: fine to block here
+        self.queue.requeue_interrupted()
+        self._tasks = [
+            asyncio.create_task(self._worker(i)) for i in range(self.n_workers)
+        ]
+        logging.info(f"Started {self.n_workers} job worker(s).")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        """Wake idle workers after a new job is submitted."""
+        self._wakeup.set()
+
+    async def _worker(self, worker_index):
+        while True:
+            job = await asyncio.to_thread(self.queue.claim_next)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            job_id = job["id"]
+            logging.info(f"Worker {worker_index} picked up job {job_id} ({job['filename']}).")
+
+            async def report_progress(done, total, job_id=job_id):
+                await asyncio.to_thread(self.queue.update_progress, job_id, done, total)
+
+            try:
+                report_id = await self.handler(job, report_progress)
+                await asyncio.to_thread(self.queue.complete, job_id, report_id)
+                logging.info(f"Job {job_id} completed (report {report_id}).")
+            except asyncio.CancelledError:
+                # Shutdown: leave the job 'running' so it is re-queued on restart
+                raise
+            except Exception as e:
+                logging.error(f"Job {job_id} failed: {e}")
+                await asyncio.to_thread(self.queue.fail, job_id, e)
+                await asyncio.to_thread(remove_upload, job["upload_path"])
@@ -0,0 +1,99 @@
+"""
+Prometheus metrics for the pipeline, served by GET /metrics.
+
+Everything lives in the default registry of this process. Useful queries:
+
+    # p95 latency per stage
+    histogram_quantile(0.95, sum by (stage, le) (rate(llm_council_stage_seconds_bucket[5m])))
+    # council-review trigger rate, by reason
+    sum by (reason) (rate(llm_council_review_checks_total{reason!="consensus"}[1h]))
+      / ignoring(reason) group_left sum(rate(llm_council_review_checks_total[1h]))
+    # LLM response cache hit rate
+    sum(rate(llm_council_cache_lookups_total{cache="llm_responses",result="hit"}[1h]))
+      / sum(rate(llm_council_cache_lookups_total{cache="llm_responses"}[1h]))
+"""
+from prometheus_client import Counter, Gauge, Histogram
+
+# Stage latencies run from sub-second (cached segmentation windows, small
+# documents) to minutes (review rounds behind a throttled provider)
+_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80, 160, 320)
+
+STAGE_SECONDS = Histogram(
+    "llm_council_stage_seconds",
+    "Duration of a pipeline stage: extraction and segmentation per contract; "
+    "initial_analysis, review and arbitration per clause; packed_initial_analysis per pack.",
+    ["stage"],
+    buckets=_LATENCY_BUCKETS,
+)
+
+
+async def timed_stage(stage, awaitable):
+    """Await a pipeline stage, observing its duration in STAGE_SECONDS."""
+    with STAGE_SECONDS.labels(stage).time():
+        return await awaitable
+
+# ─── Providers ───────────────────────────────────────────────────────────────
+
+PROVIDER_CALLS = Counter(
+    "llm_council_provider_calls_total",
+    "LLM API calls made, counting every retry attempt (cache hits excluded).",
+    ["provider"],
+)
+PROVIDER_ERRORS = Counter(
+    "llm_council_provider_errors_total",
+    "Failed LLM calls by kind: rate_limit, non_retriable, invalid_response, "
+    "circuit_open (rejected without a call) or error.",
+    ["provider", "kind"],
+)
+PROVIDER_RETRIES = Counter(
+    "llm_council_provider_retries_total",
+    "Failed LLM calls that were retried after a backoff.",
+    ["provider"],
+)
+PROVIDER_IN_FLIGHT = Gauge(
+    "llm_council_provider_in_flight",
+    "LLM calls currently awaiting the provider (including time queued in its rate limiter).",
+    ["provider"],
+)
+PROVIDER_CALL_SECONDS = Histogram(
+    "llm_council_provider_call_seconds",
+    "Duration of one LLM call attempt, successful or not.",
+    ["provider"],
+    buckets=_LATENCY_BUCKETS,
+)
+
+# ─── Council ─────────────────────────────────────────────────────────────────
+
+REVIEW_CHECKS = Counter(
+    "llm_council_review_checks_total",
+    "Golden clauses checked for disagreement, by needs_review reason "
+    "(\"consensus\" when no council review was needed).",
+    ["reason"],
+)
+# Export every reason from the start so trigger rates read 0 rather than no data
+for _reason in ("consensus", "risk_score_variance", "type_mismatch", "balance_mismatch"):
+    REVIEW_CHECKS.labels(_reason)
+
+# ─── Caches ──────────────────────────────────────────────────────────────────
+
+CACHE_LOOKUPS = Counter(
+    "llm_council_cache_lookups_total",
+    "Lookups in the on-disk caches (llm_responses, clause_verdicts), by result: hit or miss.",
+    ["cache", "result"],
+)
+CACHE_EVICTIONS = Counter(
+    "llm_council_cache_evictions_total",
+    "Entries evicted from an on-disk cache to stay under its size budget.",
+    ["cache"],
+)
+
+# ─── Load ────────────────────────────────────────────────────────────────────
+
+ACTIVE_CONTRACTS = Gauge(
+    "llm_council_active_contracts",
+    "Contracts currently running through the pipeline.",
+)
+QUEUED_CLAUSES = Gauge(
+    "llm_council_queued_clauses",
+    "Segmented clauses waiting for one of the CLAUSE_CONCURRENCY slots.",
+)
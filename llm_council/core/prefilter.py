@@ -0,0 +1,64 @@
+import math
+import re
+from collections import Counter
+from config.golden_clauses import GOLDEN_CLAUSES
+
+# Local, microsecond-scale guess at whether a clause could be one of the
+# GOLDEN_CLAUSES. Each clause type becomes a TF-IDF document built from its
+# name, definition and example; a clause scores its best cosine similarity
+# against those documents.
+
+_STOPWORDS = frozenset("""
+a an and any are as at be been by for from has have if in into is it its may
+no not of on or other such that the their then there these this those to under
+upon was were which will with within without shall party parties agreement
+""".split())
+_TOKEN_RE = re.compile(r"[a-z]+")
+_STEM_LEN = 7   # crude stemming: "termination"/"terminate" -> "termina"
+
+
+def _terms(text):
+    words = [w[:_STEM_LEN] for w in _TOKEN_RE.findall(text.lower()) if w not in _STOPWORDS and len(w) > 2]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _build_index():
+    docs = {}
+    for name, spec in GOLDEN_CLAUSES.items():
+        # The clause-type name is the strongest signal, so weight it up
+        text = " ".join([name] * 3 + [spec.get("definition", ""), spec.get("example", "")])
+        docs[name] = Counter(_terms(text))
+
+    n_docs = len(docs)
+    doc_freq = Counter(term for counts in docs.values() for term in counts)
+    idf = {term: math.log((1 + n_docs) / (1 + df)) + 1 for term, df in doc_freq.items()}
+
+    vectors = {}
+    for name, counts in docs.items():
+        vec = {t: (1 + math.log(c)) * idf[t] for t, c in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vec.values()))
+        vectors[name] = {t: v / norm for t, v in vec.items()}
+    return idf, vectors
+
+
+_IDF, _VECTORS = _build_index()
+
+
+def golden_score(clause_text):
+    """
+    Return (score, best_type): the highest cosine similarity between the
+    clause and any golden clause document, and which type produced it.
+    Terms unseen in the library are ignored, so scores fall in [0, 1].
+    """
+    counts = Counter(t for t in _terms(clause_text) if t in _IDF)
+    if not counts:
+        return 0.0, None
+    vec = {t: (1 + math.log(c)) * _IDF[t] for t, c in counts.items()}
+    norm = math.sqrt(sum(v * v for v in vec.values()))
+
+    best_score, best_type = 0.0, None
+    for name, doc in _VECTORS.items():
+        score = sum(v * doc.get(t, 0.0) for t, v in vec.items()) / norm
+        if score > best_score:
+            best_score, best_type = score, name
+    return best_score, best_type
@@ -0,0 +1,566 @@
+import base64
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from core.compression import (
+    CODECS, SegmentedCompressor, compress, decompress_file, decompress_segment,
+)
+
+# Keyword buckets for the dashboard's business-impact breakdown
+_BUSINESS_IMPACT_KEYWORDS = (
+    ("cash_flow", ("payment", "fee", "price")),
+    ("legal", ("termination", "liability", "indemni")),
+    ("ops", ("deliver", "service", "timeline")),
+)
+
+_LEVEL_COLUMNS = {"high": "high_count", "medium": "medium_count", "low": "low_count",
+                  "none": "none_count", "error": "error_count"}
+
+# Listing fields served from the summary rows, and the SQL producing each
+_SUMMARY_FIELDS = {
+    "id": "id",
+    "filename": "filename",
+    "timestamp": "timestamp",
+    "status": "'completed'",
+    "risk_level": "overall_risk",
+    "flagged_count": "flagged_count",
+    "clause_count": "clause_count",
+    "avg_risk_score": "risk_score_avg",
+}
+# Listing fields that require opening the report body
+_BODY_FIELDS = ("results", "contract_text", "pipeline_stats")
+DEFAULT_LIST_FIELDS = ("id", "filename", "timestamp", "status", "risk_level", "flagged_count")
+
+# Summary columns the aggregate row keeps running totals of
+_SUMMED_COLUMNS = (
+    "clause_count", "flagged_count", "risk_score_avg", *_LEVEL_COLUMNS.values(),
+    "cash_flow", "legal", "ops",
+)
+
+
+def contract_key(file_sha256, fingerprint):
+    """Whole-contract cache key: the same file analysed by the same pipeline."""
+    if not file_sha256 or not fingerprint:
+        return None
+    return f"{fingerprint}:{file_sha256}"
+
+
+def summarize_report(report):
+    """Summary row for a full report dict: everything listings and the dashboard need."""
+    results = report.get("results") or []
+    summary = {
+        "id": report["id"],
+        "filename": report.get("filename"),
+        "timestamp": report.get("timestamp") or "",
+        "contract_key": contract_key(report.get("file_sha256"), report.get("pipeline_fingerprint")),
+        "clause_count": len(results),
+        "flagged_count": 0,
+        "risk_score_avg": 0.0,
+        "cash_flow": 0,
+        "legal": 0,
+        "ops": 0,
+        **{column: 0 for column in _LEVEL_COLUMNS.values()},
+    }
+
+    risk_total = 0
+    for res in results:
+        level = (res.get("risk_level") or "None").lower()
+        if level == "moderate":
+            level = "medium"
+        if level in _LEVEL_COLUMNS:
+            summary[_LEVEL_COLUMNS[level]] += 1
+        if level != "none":
+            summary["flagged_count"] += 1
+
+        text = (res.get("clause_text") or "").lower()
+        for bucket, keywords in _BUSINESS_IMPACT_KEYWORDS:
+            if any(k in text for k in keywords):
+                summary[bucket] += 1
+                break
+
+        score = res.get("final_risk_score", 0)
+        risk_total += score if isinstance(score, (int, float)) else 0
+
+    if results:
+        summary["risk_score_avg"] = risk_total / len(results)
+    summary["overall_risk"] = (
+        "High" if summary["high_count"] else "Medium" if summary["medium_count"] else "Low"
+    )
+    return summary
+
+
+def _encode_cursor(timestamp, report_id):
+    raw = json.dumps([timestamp, report_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, report_id = json.loads(raw)
+        return str(timestamp), str(report_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+class ReportStore:
+    """
+    Analysed contract reports.
+
+    Each report body is a directory under reports_dir:
+
+        {id}/meta.json     – every top-level field except the two below,
+                             plus the codec and per-clause byte ranges
+        {id}/text.gz       – contract_text (UTF-8)
+        {id}/results.gz    – the results list as a JSON array, compressed so
+                             that each clause can be decompressed on its own
+
+    (.zst instead of .gz when written with zstd.) Reports saved by older
+    versions as a single {id}.json are still read.
+
+    An indexed SQLite table holds the per-report summary rows, so listings
+    never have to open the bodies. A single aggregate row keeps running
+    dashboard totals: each add or delete applies its summary's deltas in the
+    same transaction as the row change, so concurrent writers (threads or
+    processes) never lose updates and the dashboard is one row read.
+    """
+
+    def __init__(self, index_path, reports_dir, codec="gzip"):
+        self.index_path = index_path
+        self.reports_dir = reports_dir
+        self.codec = codec
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.index_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.index_path, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS reports ("
+                "id TEXT PRIMARY KEY, filename TEXT, timestamp TEXT NOT NULL, "
+                "overall_risk TEXT NOT NULL, clause_count INTEGER NOT NULL, "
+                "flagged_count INTEGER NOT NULL, risk_score_avg REAL NOT NULL, "
+                "high_count INTEGER NOT NULL, medium_count INTEGER NOT NULL, "
+                "low_count INTEGER NOT NULL, none_count INTEGER NOT NULL, "
+                "error_count INTEGER NOT NULL, cash_flow INTEGER NOT NULL, "
+                "legal INTEGER NOT NULL, ops INTEGER NOT NULL, contract_key TEXT)"
+            )
+            # Indexes created before the whole-contract cache lack its column
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(reports)")}
+            if "contract_key" not in columns:
+                conn.execute("ALTER TABLE reports ADD COLUMN contract_key TEXT")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS reports_contract_key ON reports (contract_key)"
+            )
+            # Newest-first keyset pagination, optionally within one risk level
+            conn.execute("DROP INDEX IF EXISTS reports_timestamp")
+            conn.execute("CREATE INDEX IF NOT EXISTS reports_recent ON reports (timestamp, id)")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS reports_risk_recent ON reports (overall_risk, timestamp, id)"
+            )
+            sums = ", ".join(f"{column} REAL NOT NULL DEFAULT 0" for column in _SUMMED_COLUMNS)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS aggregates ("
+                "id INTEGER PRIMARY KEY CHECK (id = 1), "
+                "total_contracts INTEGER NOT NULL DEFAULT 0, "
+                f"high_risk_contracts INTEGER NOT NULL DEFAULT 0, {sums})"
+            )
+            # First open (or an index created before aggregates existed)
+            self._rebuild_aggregates(conn, replace=False)
+            self._conn = conn
+        return self._conn
+
+    def _fetchone(self, sql, params=()):
+        # Rows are fetched under the lock: the connection is shared between threads
+        with self._lock:
+            return self._connect().execute(sql, params).fetchone()
+
+    def _fetchall(self, sql, params=()):
+        with self._lock:
+            return self._connect().execute(sql, params).fetchall()
+
+    @contextmanager
+    def _transaction(self):
+        """Serialised write transaction (also excludes other processes)."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _apply_deltas(conn, summary, sign):
+        assignments = ", ".join(f"{column} = {column} + ?" for column in _SUMMED_COLUMNS)
+        conn.execute(
+            "UPDATE aggregates SET total_contracts = total_contracts + ?, "
+            f"high_risk_contracts = high_risk_contracts + ?, {assignments} WHERE id = 1",
+            (sign, sign * (summary["high_count"] > 0),
+             *(sign * summary[column] for column in _SUMMED_COLUMNS))
+        )
+
+    @staticmethod
+    def _rebuild_aggregates(conn, replace=True):
+        """Recompute the aggregate row from the summary rows (replace=False keeps an existing one)."""
+        sums = ", ".join(f"COALESCE(SUM({column}), 0)" for column in _SUMMED_COLUMNS)
+        conn.execute(
+            f"INSERT OR {'REPLACE' if replace else 'IGNORE'} INTO aggregates "
+            f"(id, total_contracts, high_risk_contracts, "
+            f"{', '.join(_SUMMED_COLUMNS)}) "
+            f"SELECT 1, COUNT(*), COALESCE(SUM(high_count > 0), 0), {sums} FROM reports"
+        )
+
+    def _report_dir(self, report_id):
+        return os.path.join(self.reports_dir, report_id)
+
+    def _legacy_path(self, report_id):
+        return os.path.join(self.reports_dir, f"{report_id}.json")
+
+    def _part_path(self, report_id, part, codec):
+        return os.path.join(self._report_dir(report_id), f"{part}{CODECS[codec][0]}")
+
+    @staticmethod
+    def _insert(conn, summary):
+        columns = ", ".join(summary)
+        placeholders = ", ".join("?" for _ in summary)
+        conn.execute(
+            f"INSERT INTO reports ({columns}) VALUES ({placeholders})", tuple(summary.values())
+        )
+
+    def _add_summary(self, summary):
+        with self._transaction() as conn:
+            previous = conn.execute(
+                "SELECT * FROM reports WHERE id = ?", (summary["id"],)
+            ).fetchone()
+            if previous is not None:
+                # Overwriting a report: retract its old contribution first
+                self._apply_deltas(conn, dict(previous), -1)
+                conn.execute("DELETE FROM reports WHERE id = ?", (summary["id"],))
+            self._insert(conn, summary)
+            self._apply_deltas(conn, summary, +1)
+
+    def add(self, report):
+        """Write the report body, then its summary row."""
+        report_id = report["id"]
+        results = report.get("results") or []
+
+        compressor = SegmentedCompressor(self.codec)
+        compressor.add(b"[")
+        clause_ranges = [
+            compressor.add((b"," if i else b"") + json.dumps(clause).encode("utf-8"))
+            for i, clause in enumerate(results)
+        ]
+        compressor.add(b"]")
+
+        meta = {k: v for k, v in report.items() if k not in ("results", "contract_text")}
+        meta["storage"] = {"codec": self.codec, "clauses": clause_ranges}
+
+        # Build the directory under a temporary name and swap it in whole
+        os.makedirs(self.reports_dir, exist_ok=True)
+        tmp_dir = os.path.join(self.reports_dir, f".{report_id}.{uuid.uuid4().hex}.tmp")
+        os.makedirs(tmp_dir)
+        suffix = CODECS[self.codec][0]
+        with open(os.path.join(tmp_dir, f"results{suffix}"), "wb") as f:
+            f.write(compressor.finish())
+        with open(os.path.join(tmp_dir, f"text{suffix}"), "wb") as f:
+            f.write(compress(self.codec, (report.get("contract_text") or "").encode("utf-8")))
+        with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+        final_dir = self._report_dir(report_id)
+        if os.path.isdir(final_dir):
+            shutil.rmtree(final_dir)
+        os.replace(tmp_dir, final_dir)
+        if os.path.exists(self._legacy_path(report_id)):
+            os.remove(self._legacy_path(report_id))
+
+        self._add_summary(summarize_report(report))
+
+    def _read_meta(self, report_id):
+        """meta.json of a directory-format report, or None."""
+        try:
+            with open(os.path.join(self._report_dir(report_id), "meta.json"), "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _read_legacy(self, report_id):
+        try:
+            with open(self._legacy_path(report_id), "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def body_part(self, report_id, part):
+        """
+        (path, codec) of a report's compressed "results" or "text" file, for
+        serving as-is; None if the report is missing or in the legacy format.
+        """
+        meta = self._read_meta(report_id)
+        if meta is None:
+            return None
+        codec = meta["storage"]["codec"]
+        return self._part_path(report_id, part, codec), codec
+
+    def get_field(self, report_id, field):
+        """
+        One top-level field of a report, decompressing only what it needs.
+        Raises KeyError if the report does not exist.
+        """
+        meta = self._read_meta(report_id)
+        if meta is None:
+            legacy = self._read_legacy(report_id)
+            if legacy is None:
+                raise KeyError(report_id)
+            return legacy.get(field)
+
+        codec = meta["storage"]["codec"]
+        if field == "results":
+            return json.loads(decompress_file(codec, self._part_path(report_id, "results", codec)))
+        if field == "contract_text":
+            return decompress_file(codec, self._part_path(report_id, "text", codec)).decode("utf-8")
+        return meta.get(field)
+
+    def get_clause(self, report_id, index):
+        """
+        One clause result by position, decompressing only that clause.
+        Raises KeyError for a missing report and IndexError for a bad index.
+        """
+        if index < 0:
+            raise IndexError(index)
+        meta = self._read_meta(report_id)
+        if meta is None:
+            legacy = self._read_legacy(report_id)
+            if legacy is None:
+                raise KeyError(report_id)
+            return legacy.get("results", [])[index]
+
+        codec = meta["storage"]["codec"]
+        start, end = meta["storage"]["clauses"][index]
+        with open(self._part_path(report_id, "results", codec), "rb") as f:
+            f.seek(start)
+            data = f.read(end - start)
+        return json.loads(decompress_segment(codec, data).lstrip(b","))
+
+    def get_json(self, report_id):
+        """
+        The full report serialised as JSON bytes, or None if it does not
+        exist. The stored results array is spliced in without re-parsing.
+        """
+        meta = self._read_meta(report_id)
+        if meta is None:
+            legacy_path = self._legacy_path(report_id)
+            if not os.path.exists(legacy_path):
+                return None
+            with open(legacy_path, "rb") as f:
+                return f.read()
+
+        codec = meta.pop("storage")["codec"]
+        results = decompress_file(codec, self._part_path(report_id, "results", codec))
+        text = decompress_file(codec, self._part_path(report_id, "text", codec)).decode("utf-8")
+        head = json.dumps(meta).encode("utf-8")[:-1]
+        if meta:
+            head += b", "
+        return (
+            head + b'"results": ' + results
+            + b', "contract_text": ' + json.dumps(text).encode("utf-8") + b"}"
+        )
+
+    def get(self, report_id):
+        """Full report body as a dict, or None if there is no such report."""
+        body = self.get_json(report_id)
+        return json.loads(body) if body is not None else None
+
+    def find_by_contract_key(self, key):
+        """Id of the newest report with this contract_key(), or None."""
+        row = self._fetchone(
+            "SELECT id FROM reports WHERE contract_key = ? ORDER BY timestamp DESC LIMIT 1", (key,)
+        )
+        return row["id"] if row is not None else None
+
+    def exists(self, report_id):
+        row = self._fetchone("SELECT 1 FROM reports WHERE id = ?", (report_id,))
+        return row is not None
+
+    def delete(self, report_id):
+        """Remove a report's row and body; returns False if it did not exist."""
+        with self._transaction() as conn:
+            row = conn.execute("SELECT * FROM reports WHERE id = ?", (report_id,)).fetchone()
+            if row is not None:
+                conn.execute("DELETE FROM reports WHERE id = ?", (report_id,))
+                self._apply_deltas(conn, dict(row), -1)
+        shutil.rmtree(self._report_dir(report_id), ignore_errors=True)
+        try:
+            os.remove(self._legacy_path(report_id))
+        except FileNotFoundError:
+            pass
+        return row is not None
+
+    def clear(self):
+        """Drop every summary row (report bodies are removed by the caller)."""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM reports")
+            self._rebuild_aggregates(conn)
+
+    def list(self, limit=None, cursor=None, risk_levels=None, filename_prefix=None,
+             since=None, until=None, fields=None):
+        """
+        Report listing, newest first.
+
+        Returns (rows, next_cursor). Pass next_cursor back as `cursor` for the
+        following page; it is None on the last page (and when limit is None,
+        which returns every match). risk_levels filters on the overall risk
+        (High/Medium/Low), since/until on the ISO timestamp (inclusive /
+        exclusive). Only fields in _BODY_FIELDS open report bodies, and then
+        only for the rows on this page. Raises ValueError for bad arguments.
+        """
+        fields = list(fields or DEFAULT_LIST_FIELDS)
+        unknown = [f for f in fields if f not in _SUMMARY_FIELDS and f not in _BODY_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+
+        where, params = [], []
+        if cursor:
+            cursor_timestamp, cursor_id = _decode_cursor(cursor)
+            # Row-value comparison so SQLite seeks straight to the page in the index
+            where.append("(timestamp, id) < (?, ?)")
+            params += [cursor_timestamp, cursor_id]
+        if risk_levels:
+            levels = [level.strip().capitalize() for level in risk_levels]
+            levels = ["Medium" if level == "Moderate" else level for level in levels]
+            where.append(f"overall_risk IN ({', '.join('?' for _ in levels)})")
+            params += levels
+        if filename_prefix:
+            escaped = filename_prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            where.append("filename LIKE ? ESCAPE '\\'")
+            params.append(f"{escaped}%")
+        if since:
+            where.append("timestamp >= ?")
+            params.append(since)
+        if until:
+            where.append("timestamp < ?")
+            params.append(until)
+
+        # id and timestamp are always fetched: they make up the cursor
+        selected = dict.fromkeys(["id", "timestamp", *(f for f in fields if f in _SUMMARY_FIELDS)])
+        sql = (
+            f"SELECT {', '.join(f'{_SUMMARY_FIELDS[f]} AS {f}' for f in selected)} FROM reports"
+            + (f" WHERE {' AND '.join(where)}" if where else "")
+            + " ORDER BY timestamp DESC, id DESC"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit + 1)   # one extra row tells us whether a next page exists
+        rows = self._fetchall(sql, params)
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1]["timestamp"], rows[-1]["id"])
+
+        body_fields = [f for f in fields if f in _BODY_FIELDS]
+        listing = []
+        for row in rows:
+            item = {f: row[f] for f in fields if f in _SUMMARY_FIELDS}
+            for field in body_fields:
+                try:
+                    item[field] = self.get_field(row["id"], field)
+                except KeyError:
+                    item[field] = None
+            listing.append({f: item[f] for f in fields})
+        return listing, next_cursor
+
+    def dashboard_stats(self):
+        """Aggregate stats across all reports, read from the running totals."""
+        row = self._fetchone("SELECT * FROM aggregates WHERE id = 1")
+        risk_distribution = {
+            level: int(row[_LEVEL_COLUMNS[level]]) for level in ("high", "medium", "low", "none")
+        }
+        if row["error_count"]:
+            risk_distribution["error"] = int(row["error_count"])
+        total = row["total_contracts"]
+        return {
+            "total_contracts": total,
+            "high_risk_contracts": row["high_risk_contracts"],
+            "total_risky_clauses": int(row["flagged_count"]),
+            "avg_risk_score": row["risk_score_avg"] / total if total else 0,
+            "total_clauses": int(row["clause_count"]),
+            "risk_distribution": risk_distribution,
+            "business_impact": {k: int(row[k]) for k in ("cash_flow", "legal", "ops")},
+        }
+
+    def _stored_ids(self):
+        """Ids of every report body on disk, in either format."""
+        if not os.path.isdir(self.reports_dir):
+            return set()
+        ids = set()
+        for name in os.listdir(self.reports_dir):
+            if name.endswith(".json"):
+                ids.add(name[:-len(".json")])
+            elif not name.startswith(".") and os.path.isdir(os.path.join(self.reports_dir, name)):
+                ids.add(name)
+        return ids
+
+    def _read_bodies(self, report_ids=None):
+        """
+        Yield (report_id, body) for stored reports, with the fields summaries
+        need (contract_text is not loaded). Malformed reports are skipped.
+        """
+        for report_id in sorted(self._stored_ids() if report_ids is None else report_ids):
+            try:
+                meta = self._read_meta(report_id)
+                if meta is None:
+                    body = self._read_legacy(report_id)
+                else:
+                    body = {**meta, "results": self.get_field(report_id, "results")}
+                if body is not None:
+                    yield report_id, body
+            except Exception as e:
+                logging.warning(f"Skipping malformed report {report_id}: {e}")
+
+    def reconcile(self):
+        """
+        Repair operation: re-summarise every report body and rebuild the
+        summary rows and aggregate totals from scratch. Returns the stats.
+        """
+        # Scan inside the transaction so a report added meanwhile either is
+        # picked up by the scan or has its summary row written after ours
+        with self._transaction() as conn:
+            summaries = [
+                summarize_report({**report, "id": report_id})
+                for report_id, report in self._read_bodies()
+            ]
+            conn.execute("DELETE FROM reports")
+            for summary in summaries:
+                self._insert(conn, summary)
+            self._rebuild_aggregates(conn)
+        logging.info(f"Reconciled report index: {len(summaries)} report(s).")
+        return self.dashboard_stats()
+
+    def import_legacy_reports(self):
+        """
+        Index stored reports that have no summary row yet (reports saved
+        before the index existed, or copied in by hand). Returns the count.
+        """
+        known = {row["id"] for row in self._fetchall("SELECT id FROM reports")}
+        unindexed = self._stored_ids() - known
+        imported = 0
+        for report_id, report in self._read_bodies(unindexed):
+            self._add_summary(summarize_report({**report, "id": report_id}))
+            imported += 1
+        if imported:
+            logging.info(f"Indexed {imported} existing report(s) from {self.reports_dir}.")
+        return imported
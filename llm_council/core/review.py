@@ -2,10 +2,11 @@ import json
 import asyncio
 import logging
 
-from config.prompts import REVIEW_PROMPT
+from config.prompts import REVIEW_PREFIX, REVIEW_SUFFIX
 from core.schemas import SingleReviewOutput
 from models.registry import get_active_models, API_KEY_MAP
 from models.utils import safe_llm_call
+from models.breaker import CircuitOpenError
 
 
 async def review_round(clause_text, initial_outputs):
@@ -14,14 +15,14 @@ async def review_round(clause_text, initial_outputs):
     n_models = len(active_models)
 
     # -------- STEP 1: Build dynamic labels (A, B, C, ...) --------
-    # Note: REVIEW_PROMPT expects the same labels in its JSON template.
+    # Note: REVIEW_PREFIX expects the same labels in its JSON template.
     # If n_models != 3 the prompt JSON template won't perfectly match the
     # actual responses. Log a warning so this is visible.
     label_letters = [chr(ord("A") + i) for i in range(n_models)]
     labels = [f"Response {l}" for l in label_letters]
     if n_models != 3:
         logging.warning(
-            f"review_round: {n_models} models active but REVIEW_PROMPT is "
+            f"review_round: {n_models} models active but the review prompt is "
             "designed for 3. Consider updating the prompt template in "
             "config/prompts.py to match the actual number of models."
         )
@@ -42,7 +43,7 @@ async def review_round(clause_text, initial_outputs):
         responses_text += f"{label}:\n{json.dumps(content, indent=2)}\n\n"
 
     # -------- STEP 4: Format prompt --------
-    prompt = REVIEW_PROMPT.format(
+    prompt = REVIEW_PREFIX + REVIEW_SUFFIX.format(
         clause_text=clause_text,
         responses_text=responses_text
     )
@@ -50,14 +51,19 @@ async def review_round(clause_text, initial_outputs):
     # -------- STEP 5: Call all active reviewers --------
     reviewer_names = [f"Reviewer_{i+1}" for i in range(n_models)]
 
-    tasks = [
-        safe_llm_call(
-            lambda p, fn=fn, name=name: fn(p, api_key=API_KEY_MAP[name]()),
-            prompt,
-            SingleReviewOutput
-        )
-        for name, fn in active_models.items()
-    ]
+    async def run_reviewer(name, fn):
+        try:
+            return await safe_llm_call(
+                lambda p: fn(p, api_key=API_KEY_MAP[name]()),
+                prompt,
+                SingleReviewOutput,
+                provider=name
+            )
+        except CircuitOpenError as e:
+            logging.warning(str(e))
+            return None
+
+    tasks = [run_reviewer(name, fn) for name, fn in active_models.items()]
 
     validated_results = await asyncio.gather(*tasks)
 
@@ -0,0 +1,98 @@
+import difflib
+from config.settings import REVISION_MATCH_THRESHOLD
+from core.verdict_cache import normalize_clause_text
+
+
+def align_clauses(parent_texts, new_texts, match_threshold=REVISION_MATCH_THRESHOLD):
+    """
+    Align the clauses of a revised contract with those of its parent.
+
+    Clauses whose normalised text (case, whitespace and numbering folded) is
+    identical are paired first, wherever they moved to. Remaining clauses are
+    paired greedily by difflib similarity, best pairs first, when it reaches
+    match_threshold.
+
+    Returns a dict:
+        "unchanged": {new_index: parent_index}
+        "modified":  {new_index: (parent_index, similarity)}
+        "new":       [new_index, ...]     – no counterpart in the parent
+        "removed":   [parent_index, ...]  – no counterpart in the revision
+    """
+    parent_norm = [normalize_clause_text(t) for t in parent_texts]
+    new_norm = [normalize_clause_text(t) for t in new_texts]
+
+    by_text = {}
+    for i, text in enumerate(parent_norm):
+        by_text.setdefault(text, []).append(i)
+    unchanged = {}
+    for j, text in enumerate(new_norm):
+        if by_text.get(text):
+            unchanged[j] = by_text[text].pop(0)
+
+    free_parents = sorted(set(range(len(parent_texts))) - set(unchanged.values()))
+    free_new = [j for j in range(len(new_texts)) if j not in unchanged]
+    candidates = []
+    for j in free_new:
+        matcher = difflib.SequenceMatcher(None, autojunk=False)
+        matcher.set_seq2(new_norm[j])
+        for i in free_parents:
+            matcher.set_seq1(parent_norm[i])
+            # Cheap upper bounds first; ratio() is quadratic in the worst case
+            if matcher.real_quick_ratio() < match_threshold or matcher.quick_ratio() < match_threshold:
+                continue
+            similarity = matcher.ratio()
+            if similarity >= match_threshold:
+                candidates.append((similarity, j, i))
+
+    modified = {}
+    taken = set()
+    for similarity, j, i in sorted(candidates, key=lambda c: (-c[0], c[1], c[2])):
+        if j not in modified and i not in taken:
+            modified[j] = (i, round(similarity, 3))
+            taken.add(i)
+
+    return {
+        "unchanged": unchanged,
+        "modified": dict(sorted(modified.items())),
+        "new": [j for j in free_new if j not in modified],
+        "removed": [i for i in free_parents if i not in taken],
+    }
+
+
+def revise_from_parent(parent_results, clauses):
+    """
+    Align clauses (dicts with clause_id and clause_text) with the results of
+    their parent report.
+
+    Returns (reused, revision): reused maps clause index to the parent
+    verdict it can carry over (parent clauses that errored or skipped review
+    for budget are analysed again); revision is the summary stored in the
+    pipeline stats, with clause ids in place of indices.
+    """
+    alignment = align_clauses(
+        [r.get("clause_text") or "" for r in parent_results],
+        [c["clause_text"] for c in clauses],
+    )
+    reused = {
+        j: parent_results[i] for j, i in alignment["unchanged"].items()
+        if parent_results[i].get("risk_level") != "Error"
+        and not parent_results[i].get("council_review_skipped")
+    }
+
+    def parent_id(i):
+        return parent_results[i].get("clause_id")
+
+    revision = {
+        "reused": [
+            {"clause_id": clauses[j]["clause_id"], "parent_clause_id": parent_id(i)}
+            for j, i in alignment["unchanged"].items() if j in reused
+        ],
+        "modified": [
+            {"clause_id": clauses[j]["clause_id"], "parent_clause_id": parent_id(i),
+             "similarity": similarity}
+            for j, (i, similarity) in alignment["modified"].items()
+        ],
+        "new": [clauses[j]["clause_id"] for j in alignment["new"]],
+        "removed": [parent_id(i) for i in alignment["removed"]],
+    }
+    return reused, revision
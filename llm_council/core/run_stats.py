@@ -0,0 +1,4 @@
+def bump(run_stats, key, amount=1):
+    """Increment a counter in an optional run_stats dict (no-op when None)."""
+    if run_stats is not None:
+        run_stats[key] = run_stats.get(key, 0) + amount
@@ -0,0 +1,73 @@
+import asyncio
+
+
+class StartPacer:
+    """Spaces out task starts so that at most `rate` start per second (0 = unlimited)."""
+
+    def __init__(self, rate: float = 0):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            delay = self._next_start - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_start = max(loop.time(), self._next_start) + self.interval
+
+
+async def iter_bounded(items, worker, concurrency, rate=0):
+    """
+    Run worker(index, item) over items keeping up to `concurrency` calls in
+    flight at all times, and yield (index, result) as each one finishes.
+
+    Unlike fixed batches, a slow item never holds back the items queued
+    behind it: as soon as any call finishes, the next item starts. `rate`
+    caps how many items may start per second (0 = unlimited).
+
+    If a worker raises, the exception propagates to the consumer and the
+    remaining calls are cancelled.
+    """
+    items = list(items)
+    if not items:
+        return
+
+    pending = iter(enumerate(items))
+    done = asyncio.Queue()
+    pacer = StartPacer(rate)
+
+    async def runner():
+        # All runners share one iterator; next() never awaits so this is safe.
+        for index, item in pending:
+            await pacer.wait()
+            try:
+                result = await worker(index, item)
+            except Exception as e:
+                await done.put((index, None, e))
+                return
+            await done.put((index, result, None))
+
+    runners = [asyncio.create_task(runner()) for _ in range(max(1, min(concurrency, len(items))))]
+    try:
+        for _ in range(len(items)):
+            index, result, error = await done.get()
+            if error is not None:
+                raise error
+            yield index, result
+    finally:
+        for task in runners:
+            task.cancel()
+        await asyncio.gather(*runners, return_exceptions=True)
+
+
+async def run_bounded(items, worker, concurrency, rate=0):
+    """Like iter_bounded, but return all results in input order."""
+    items = list(items)
+    results = [None] * len(items)
+    async for index, result in iter_bounded(items, worker, concurrency, rate):
+        results[index] = result
+    return results
@@ -20,6 +20,11 @@ class AnalysisOutput(BaseModel):
         return v
 
 
+class PackedAnalysisItem(AnalysisOutput):
+    """One clause's entry in a packed (multi-clause) analysis response."""
+    clause_index: int
+
+
 class ResponseCritique(BaseModel):
     strengths: str
     weaknesses: str
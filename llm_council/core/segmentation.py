@@ -1,32 +1,121 @@
+import asyncio
 import logging
-from config.prompts import SEGMENTATION_PROMPT
-from config.settings import SEGMENTATION_MODEL
+import re
+from config.prompts import SEGMENTATION_PREFIX, SEGMENTATION_SUFFIX
+from config.settings import (
+    SEGMENTATION_MODEL, SEGMENTATION_WINDOW_CHARS,
+    SEGMENTATION_WINDOW_OVERLAP_CHARS, SEGMENTATION_MAX_CONCURRENCY,
+)
+from core.verdict_cache import normalize_clause_text
 from models.registry import MODEL_REGISTRY, API_KEY_MAP
+from models.utils import safe_llm_call
 
+# Lines that open a new clause: "12.", "4.2.1 Fees", "(a)", "IV.", "Section 5", ...
+_NUMBERED_HEADING_RE = re.compile(
+    r"^\s*(?:"
+    r"(?:section|article|clause|schedule|exhibit|appendix|annex)\s+\w+"
+    r"|\d+(?:\.\d+)*[.)]?\s+\S"
+    r"|\(?[a-z]\)\s"
+    r"|[ivxlc]+\.\s"
+    r")",
+    re.IGNORECASE
+)
+# ...or an all-caps heading line such as "CONFIDENTIALITY" / "GOVERNING LAW"
+_CAPS_HEADING_RE = re.compile(r"^\s*[A-Z][A-Z0-9 ,&/'\-]{3,}:?\s*$")
 
-async def segment_contract(contract_text):
+
+def _is_heading(line: str) -> bool:
+    return bool(_NUMBERED_HEADING_RE.match(line) or _CAPS_HEADING_RE.match(line))
+
+
+def _hard_split(block: str, max_chars: int, separators=("\n\n", "\n")):
+    """Split an oversized block on paragraph, then line, then character boundaries."""
+    if len(block) <= max_chars:
+        return [block]
+    if not separators:
+        return [block[i:i + max_chars] for i in range(0, len(block), max_chars)]
+
+    sep, rest = separators[0], separators[1:]
+    pieces, current = [], ""
+    for part in block.split(sep):
+        candidate = current + sep + part if current else part
+        if current and len(candidate) > max_chars:
+            pieces.append(current + sep)
+            current = part
+        else:
+            current = candidate
+    pieces.append(current)
+
+    result = []
+    for piece in pieces:
+        if piece:
+            result.extend(_hard_split(piece, max_chars, rest))
+    return result
+
+
+def _split_blocks(text: str, max_chars: int):
+    """Cut text into heading-delimited blocks, none longer than max_chars."""
+    blocks, current = [], []
+    for line in text.splitlines(keepends=True):
+        if current and _is_heading(line):
+            blocks.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        blocks.append("".join(current))
+
+    sized = []
+    for block in blocks:
+        sized.extend(_hard_split(block, max_chars))
+    return sized
+
+
+def split_into_windows(text: str, max_chars=SEGMENTATION_WINDOW_CHARS,
+                       overlap_chars=SEGMENTATION_WINDOW_OVERLAP_CHARS):
     """
-    Segment contract text into clauses using the model defined by
-    SEGMENTATION_MODEL in config/settings.py (defaults to 'openai').
+    Deterministically split contract text into overlapping windows.
 
-    Returns a list of dicts, each with 'clause_id' and 'clause_text'.
-    Raises ValueError if the model key is missing or the output is invalid.
+    Windows only break on heading/numbering boundaries (falling back to
+    paragraph or line breaks for oversized sections). Each window after the
+    first starts with up to overlap_chars of trailing blocks from the
+    previous window so a clause cut at a window edge appears whole in one
+    of them.
     """
-    api_key = API_KEY_MAP[SEGMENTATION_MODEL]()
-    if not api_key:
-        raise ValueError(
-            f"API key for SEGMENTATION_MODEL='{SEGMENTATION_MODEL}' is missing from environment."
-        )
+    return _windows_with_overlaps(text, max_chars, overlap_chars)[0]
 
-    prompt = SEGMENTATION_PROMPT.format(contract_text=contract_text)
-    fn = MODEL_REGISTRY[SEGMENTATION_MODEL]
 
-    result = await fn(prompt, api_key=api_key)
+def _windows_with_overlaps(text, max_chars=SEGMENTATION_WINDOW_CHARS,
+                           overlap_chars=SEGMENTATION_WINDOW_OVERLAP_CHARS):
+    """split_into_windows, also returning the text each window repeats from the previous one."""
+    if len(text) <= max_chars:
+        return [text], [""]
 
-    # ── Validate output ──────────────────────────────────────────────────────
-    if not isinstance(result, list) or len(result) == 0:
+    blocks = _split_blocks(text, max_chars)
+    windows, overlaps = [], [""]
+    start = 0
+    while start < len(blocks):
+        end, size = start, 0
+        while end < len(blocks) and (end == start or size + len(blocks[end]) <= max_chars):
+            size += len(blocks[end])
+            end += 1
+        windows.append("".join(blocks[start:end]))
+        if end >= len(blocks):
+            break
+
+        # Back up over trailing blocks to build the overlap, always moving forward
+        next_start, overlap = end, 0
+        while next_start - 1 > start and overlap + len(blocks[next_start - 1]) <= overlap_chars:
+            next_start -= 1
+            overlap += len(blocks[next_start])
+        overlaps.append("".join(blocks[next_start:end]))
+        start = next_start
+    return windows, overlaps
+
+
+def _validate_clauses(result, window_index):
+    if not isinstance(result, list):
         raise ValueError(
-            f"Segmentation returned an empty or non-list result: {result!r}"
+            f"Segmentation of window {window_index} returned a non-list result: {result!r}"
         )
 
     valid_clauses = []
@@ -41,12 +130,99 @@ async def segment_contract(contract_text):
             )
             continue
         valid_clauses.append(item)
+    return valid_clauses
+
+
+def stitch_windows(window_clauses, overlaps):
+    """
+    Merge per-window clause lists into one, dropping clauses duplicated by
+    the overlap between neighbouring windows and renumbering clause_id.
+
+    overlaps[k] is the text window k repeats from window k-1. Only clauses
+    lying inside it are compared with window k-1's: a clause from window k
+    that equals, starts or ends a clause from window k-1 is a duplicate; one
+    that extends a clause of window k-1 (the earlier window saw a copy cut
+    off at its edge) replaces it. Clauses elsewhere are always kept, however
+    similar their text.
+    """
+    stitched = []          # list of [clause, normalised_text]
+    previous = []          # indices into stitched from the previous window
+
+    for clauses, overlap in zip(window_clauses, overlaps):
+        overlap_norm = normalize_clause_text(overlap)
+        added = []
+        for clause in clauses:
+            norm = normalize_clause_text(str(clause["clause_text"]))
+            if not norm:
+                continue
+            match = None
+            for idx in previous if overlap_norm else ():
+                prev_norm = stitched[idx][1]
+                if norm in overlap_norm and (
+                    prev_norm.startswith(norm) or prev_norm.endswith(norm)
+                ):
+                    match = idx
+                    break
+                if prev_norm in overlap_norm and norm.startswith(prev_norm):
+                    stitched[idx] = [clause, norm]
+                    match = idx
+                    break
+            if match is None:
+                stitched.append([clause, norm])
+                added.append(len(stitched) - 1)
+            elif match not in added:
+                added.append(match)
+        previous = added
+
+    return [
+        {**clause, "clause_id": i + 1}
+        for i, (clause, _) in enumerate(stitched)
+    ]
+
+
+async def segment_contract(contract_text):
+    """
+    Segment contract text into clauses using the model defined by
+    SEGMENTATION_MODEL in config/settings.py (defaults to 'openai').
+
+    Long contracts are split into overlapping windows (see
+    split_into_windows) that are segmented concurrently, so latency tracks
+    the largest window rather than the whole document.
+
+    Returns a list of dicts, each with 'clause_id' and 'clause_text'.
+    Raises ValueError if the model key is missing or the output is invalid.
+    """
+    api_key = API_KEY_MAP[SEGMENTATION_MODEL]()
+    if not api_key:
+        raise ValueError(
+            f"API key for SEGMENTATION_MODEL='{SEGMENTATION_MODEL}' is missing from environment."
+        )
+
+    fn = MODEL_REGISTRY[SEGMENTATION_MODEL]
+    windows, overlaps = _windows_with_overlaps(contract_text)
+    semaphore = asyncio.Semaphore(SEGMENTATION_MAX_CONCURRENCY)
+
+    async def segment_window(index, window_text):
+        prompt = SEGMENTATION_PREFIX + SEGMENTATION_SUFFIX.format(contract_text=window_text)
+        async with semaphore:
+            result = await safe_llm_call(
+                lambda p: fn(p, api_key=api_key), prompt, provider=SEGMENTATION_MODEL
+            )
+        return _validate_clauses(result, index)
+
+    window_clauses = await asyncio.gather(
+        *(segment_window(i, w) for i, w in enumerate(windows))
+    )
+
+    raw_count = sum(len(c) for c in window_clauses)
+    valid_clauses = stitch_windows(window_clauses, overlaps)
 
     if not valid_clauses:
         raise ValueError("Segmentation produced no valid clauses after validation.")
 
     logging.info(
-        f"Segmentation complete: {len(valid_clauses)}/{len(result)} clauses valid "
+        f"Segmentation complete: {len(valid_clauses)} clauses from {len(windows)} "
+        f"window(s), {raw_count - len(valid_clauses)} overlap duplicates dropped "
         f"(model: {SEGMENTATION_MODEL})."
     )
     return valid_clauses
@@ -0,0 +1,187 @@
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+
+from python_multipart import MultipartParser
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import parse_options_header
+
+
+class UploadTooLargeError(ValueError):
+    """The upload exceeded the size limit while it was being received."""
+
+
+class SpooledUpload:
+    """An upload streamed to a file on disk, with its size and SHA-256."""
+
+    def __init__(self, path, filename, ext, size, sha256):
+        self.path = path
+        self.filename = filename
+        self.ext = ext
+        self.size = size
+        self.sha256 = sha256
+        self._moved = False
+
+    @classmethod
+    def from_file(cls, path, filename, ext, chunk_size=1024 * 1024):
+        """Wrap a file that is already on disk, hashing it."""
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, "rb") as f:
+            while chunk := f.read(chunk_size):
+                digest.update(chunk)
+                size += len(chunk)
+        return cls(path, filename, ext, size, digest.hexdigest())
+
+    def move_to(self, dest_path):
+        shutil.move(self.path, dest_path)
+        self.path = dest_path
+        self._moved = True
+
+    def discard(self):
+        """Remove the spooled file if it has not been moved somewhere permanent."""
+        if self._moved:
+            return
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class UnsupportedUploadError(ValueError):
+    """The request carried no usable file part, or one with a disallowed extension."""
+
+
+# Room for the multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def _too_large(max_bytes):
+    return UploadTooLargeError(f"File too large. Maximum allowed is {max_bytes // (1024 * 1024)} MB.")
+
+
+class _FilePartWriter:
+    """
+    python-multipart callbacks that write the first part named field straight
+    to a spool file, hashing and counting it as it arrives. Other parts are
+    skipped. Bytes are queued in pending and written by receive_upload, so
+    disk writes stay off the parser callbacks.
+    """
+
+    def __init__(self, field, spool_dir, allowed_extensions, max_bytes):
+        self.field = field
+        self.spool_dir = spool_dir
+        self.allowed_extensions = allowed_extensions
+        self.max_bytes = max_bytes
+        self.upload = None
+        self.out = None
+        self.pending = []
+        self._digest = hashlib.sha256()
+        self._in_file = False
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+
+    def callbacks(self):
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+    def on_part_begin(self):
+        self._disposition = b""
+
+    def on_header_field(self, data, start, end):
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        if self.upload is not None or options.get(b"name") != self.field.encode():
+            return
+        filename = options.get(b"filename", b"").decode("utf-8", "replace")
+        ext = os.path.splitext(filename)[1].lower()
+        if ext not in self.allowed_extensions:
+            raise UnsupportedUploadError(
+                f"Unsupported file type '{ext}'. Allowed: {', '.join(self.allowed_extensions)}"
+            )
+        fd, path = tempfile.mkstemp(dir=self.spool_dir, suffix=ext)
+        self.out = os.fdopen(fd, "wb")
+        self.upload = SpooledUpload(path, filename, ext, 0, None)
+        self._in_file = True
+
+    def on_part_data(self, data, start, end):
+        if not self._in_file:
+            return
+        chunk = data[start:end]
+        self.upload.size += len(chunk)
+        if self.upload.size > self.max_bytes:
+            raise _too_large(self.max_bytes)
+        self._digest.update(chunk)
+        self.pending.append(chunk)
+
+    def on_part_end(self):
+        if self._in_file:
+            self._in_file = False
+            self.upload.sha256 = self._digest.hexdigest()
+
+    def flush(self):
+        if self.pending:
+            self.out.write(b"".join(self.pending))
+            self.pending.clear()
+
+
+async def receive_upload(request, spool_dir, allowed_extensions, max_bytes, field="file"):
+    """
+    Parse a multipart/form-data request body straight off the socket and
+    write its file part to a temp file in spool_dir, hashing as it goes, so
+    the upload is written to disk exactly once. Raises UploadTooLargeError
+    as soon as the file passes max_bytes (or the body passes it plus
+    MULTIPART_OVERHEAD_BYTES), and UnsupportedUploadError for a malformed
+    body or a file with a disallowed extension; the partial file is removed
+    either way.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise UnsupportedUploadError("Expected a multipart/form-data upload.")
+
+    os.makedirs(spool_dir, exist_ok=True)
+    writer = _FilePartWriter(field, spool_dir, allowed_extensions, max_bytes)
+    parser = MultipartParser(params[b"boundary"], writer.callbacks())
+    body_limit = max_bytes + MULTIPART_OVERHEAD_BYTES
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > body_limit:
+                raise _too_large(max_bytes)
+            try:
+                parser.write(chunk)
+            except MultipartParseError as e:
+                raise UnsupportedUploadError(f"Malformed multipart body: {e}")
+            if writer.pending:
+                await asyncio.to_thread(writer.flush)
+        parser.finalize()
+        if writer.upload is None or writer.upload.sha256 is None:
+            raise UnsupportedUploadError(f"No file was uploaded in the '{field}' field.")
+    except BaseException:
+        if writer.out is not None:
+            writer.out.close()
+            writer.upload.discard()
+        raise
+    writer.out.close()
+    return writer.upload
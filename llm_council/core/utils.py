@@ -1,20 +1,103 @@
 import pdfplumber
+import pypdfium2 as pdfium
 from docx import Document
 import io
+import re
+from config.settings import PDF_BACKEND
 
-def extract_text_from_pdf(content: bytes) -> str:
-    """Extract text from PDF bytes."""
-    with pdfplumber.open(io.BytesIO(content)) as pdf:
-        text = ""
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-    return text
-
-def extract_text_from_docx(content: bytes) -> str:
-    """Extract text from DOCX bytes."""
-    doc = Document(io.BytesIO(content))
+# ─── PDF backends ─────────────────────────────────────────────────────────────
+# A backend takes a PDF (path or bytes) and a page range [start, end) and
+# returns one text string per page.
+
+def _open_pdfplumber(source):
+    return pdfplumber.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+
+def _pdfplumber_pages(source, start, end):
+    with _open_pdfplumber(source) as pdf:
+        return [pdf.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+def _pdfium_pages(source, start, end):
+    pdf = pdfium.PdfDocument(source)
+    try:
+        texts = []
+        for i in range(start, end):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            text = textpage.get_text_range()
+            textpage.close()
+            page.close()
+            texts.append(text.replace("\r\n", "\n").replace("\r", "\n"))
+        return texts
+    finally:
+        pdf.close()
+
+
+PDF_BACKENDS = {
+    "pdfium": _pdfium_pages,
+    "pdfplumber": _pdfplumber_pages,
+}
+
+
+def pdf_page_count(source):
+    pdf = pdfium.PdfDocument(source)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+_LETTER_RUN = re.compile(r"[^\W\d_]+")
+
+
+def layout_looks_poor(text):
+    """
+    Heuristic check for pdfium output that pdfplumber is likely to do better on:
+    unmapped glyphs, words run together (missing spaces) or letter-spaced text.
+    """
+    if len(text) < 40:
+        return False
+    if text.count("\ufffd") > len(text) * 0.01:
+        return True
+    words = _LETTER_RUN.findall(text)
+    if not words:
+        return False
+    if sum(len(w) for w in words) / len(words) > 12:
+        return True
+    return sum(1 for w in words if len(w) == 1) > len(words) * 0.4
+
+
+def extract_pdf_pages(source, start=0, end=None, backend=PDF_BACKEND):
+    """
+    Text of pages [start, end) of a PDF given as a path or bytes.
+
+    backend is "pdfium", "pdfplumber" or "auto" (pdfium, re-extracting pages
+    whose layout looks poor with pdfplumber). Returns (page_texts,
+    fallback_pages) where fallback_pages lists the 0-based pages that fell back.
+    """
+    if end is None:
+        end = pdf_page_count(source)
+    if backend != "auto":
+        return PDF_BACKENDS[backend](source, start, end), []
+
+    texts = _pdfium_pages(source, start, end)
+    poor = [start + i for i, text in enumerate(texts) if layout_looks_poor(text)]
+    if poor:
+        with _open_pdfplumber(source) as pdf:
+            for page_no in poor:
+                texts[page_no - start] = pdf.pages[page_no].extract_text() or ""
+    return texts, poor
+
+
+def extract_text_from_pdf(content) -> str:
+    """Extract text from PDF bytes or a PDF file path."""
+    page_texts, _ = extract_pdf_pages(content)
+    return "".join(t + "\n" for t in page_texts if t)
+
+def extract_text_from_docx(content) -> str:
+    """Extract text from DOCX bytes or a DOCX file path."""
+    doc = Document(io.BytesIO(content) if isinstance(content, bytes) else content)
     return "\n".join([paragraph.text for paragraph in doc.paragraphs])
 
 def extract_text_from_file(content: bytes, filename: str) -> str:
@@ -30,3 +113,13 @@ def extract_text_from_file(content: bytes, filename: str) -> str:
             return content.decode("utf-8")
         except UnicodeDecodeError:
             return content.decode("latin-1")
+
+def extract_text_from_path(path: str, filename: str) -> str:
+    """Extract text from a file on disk, based on the original filename's extension."""
+    ext = filename.split(".")[-1].lower()
+    if ext == "pdf":
+        return extract_text_from_pdf(path)
+    elif ext == "docx":
+        return extract_text_from_docx(path)
+    with open(path, "rb") as f:
+        return extract_text_from_file(f.read(), filename)
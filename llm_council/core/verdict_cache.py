@@ -0,0 +1,89 @@
+import hashlib
+import logging
+import re
+import sqlite3
+from config.settings import (
+    VERDICT_CACHE_ENABLED, VERDICT_CACHE_PATH,
+    VERDICT_CACHE_MAX_BYTES, VERDICT_CACHE_TTL_SECS,
+)
+from core.fingerprint import council_fingerprint
+from models.cache import SQLiteLRUCache
+
+# A well-formed roman numeral up to 399, so that words spelt with the same
+# letters ("civil.", "ill.") are not mistaken for one
+_ROMAN = r"(?=[ivxlc])c{0,3}(?:xc|xl|l?x{0,3})(?:ix|iv|v?i{0,3})"
+
+# Leading enumerators such as "12.", "4.2.1", "(a)", "iv)", "Section 7", "Article IV"
+_NUMBERING_RE = re.compile(
+    r"^\s*(?:"
+    r"(?:section|article|clause)\s+(?:\d+(?:\.\d+)*|" + _ROMAN + r")[.):]?"
+    r"|\d+(?:\.\d+)+[.)]?"
+    r"|\d+[.)]"
+    r"|\(?[a-z]\)"
+    r"|\(?" + _ROMAN + r"[.)]"
+    r")\s+",
+    re.IGNORECASE
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+verdict_store = SQLiteLRUCache(
+    VERDICT_CACHE_PATH,
+    max_bytes=VERDICT_CACHE_MAX_BYTES,
+    ttl_secs=VERDICT_CACHE_TTL_SECS,
+    table="clause_verdicts",
+)
+
+_fingerprint = council_fingerprint()
+_stale_purged = False
+
+
+def normalize_clause_text(text: str) -> str:
+    """Fold case, collapse whitespace and strip leading numbering on every line."""
+    lines = []
+    for line in (text or "").splitlines():
+        line = _NUMBERING_RE.sub("", line, count=1)
+        if line.strip():
+            lines.append(line)
+    return _WHITESPACE_RE.sub(" ", " ".join(lines)).strip().casefold()
+
+
+def verdict_key(clause_text: str) -> str:
+    digest = hashlib.sha256(normalize_clause_text(clause_text).encode("utf-8")).hexdigest()
+    return f"{_fingerprint}:{digest}"
+
+
+def _purge_stale_once():
+    """Reclaim space held by verdicts from older prompt/library versions."""
+    global _stale_purged
+    if _stale_purged:
+        return
+    _stale_purged = True
+    removed = verdict_store.purge_except_prefix(f"{_fingerprint}:")
+    if removed:
+        logging.info(f"Verdict cache: dropped {removed} entries from a previous council fingerprint.")
+
+
+def get_verdict(clause_text):
+    """Return the cached final verdict for this clause, or None."""
+    if not VERDICT_CACHE_ENABLED:
+        return None
+    try:
+        _purge_stale_once()
+        return verdict_store.get(verdict_key(clause_text))
+    except sqlite3.Error as e:
+        logging.warning(f"Verdict cache read failed: {e}")
+        return None
+
+
+def store_verdict(clause_text, verdict):
+    if not VERDICT_CACHE_ENABLED:
+        return
+    try:
+        verdict_store.set(verdict_key(clause_text), verdict)
+    except (sqlite3.Error, TypeError, ValueError) as e:
+        logging.warning(f"Verdict cache write failed: {e}")
+
+
+def invalidate_verdicts():
+    """Drop every cached verdict, e.g. after editing prompts or golden clauses."""
+    verdict_store.clear()
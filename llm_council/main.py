@@ -1,13 +1,24 @@
 import asyncio
+import contextlib
 import json
 import logging
 import pathlib
 from core.segmentation import segment_contract
-from core.analysis import initial_analysis
+from core.analysis import initial_analysis, packed_initial_analysis, pack_clauses
 from core.review import review_round
 from core.arbitration import arbitration
 from core.disagreement import should_proceed, needs_review
-from config.settings import BATCH_SIZE, INTER_BATCH_DELAY_SECS
+from core.verdict_cache import get_verdict, store_verdict
+from core.prefilter import golden_score
+from core.revision import revise_from_parent
+from core.run_stats import bump
+from core.scheduler import iter_bounded
+from core.metrics import timed_stage, REVIEW_CHECKS, ACTIVE_CONTRACTS, QUEUED_CLAUSES
+from models.usage import UsageLedger, usage_scope
+from config.settings import (
+    CLAUSE_CONCURRENCY, CLAUSE_START_RATE, PREFILTER_MODE, PREFILTER_THRESHOLD,
+    PACKED_ANALYSIS, CONTRACT_TOKEN_BUDGET,
+)
 from dotenv import load_dotenv
 
 # Custom logging formatter for colors
@@ -59,101 +70,211 @@ logging.basicConfig(
 load_dotenv()
 
 
+def non_golden_result(clause_id, clause_text, justification, confidence=1.0):
+    """Result for a clause that is settled as not matching any golden clause."""
+    return {
+        "clause_id": clause_id,
+        "clause_text": clause_text,
+        "golden_clause_detected": False,
+        "golden_clause_type": None,
+        "final_risk_score": 0.0,
+        "risk_level": "None",
+        "business_risk_if_ignored": None,
+        "suggested_correction": None,
+        "justification": justification,
+        "confidence": confidence
+    }
+
+
+async def run_stage(stage, awaitable):
+    """Await a pipeline stage, timing it and attributing its token usage to stage."""
+    with usage_scope(stage=stage):
+        return await timed_stage(stage, awaitable)
 
 
-async def run_pipeline(contract_text, output_path=None):
+async def iter_pipeline(contract_text, run_stats=None, parent_results=None):
     """
-    Run the full contract analysis pipeline.
+    Run the full contract analysis pipeline, yielding events as it goes.
+
+    Events are dicts with "event" and "data" keys, emitted in this order:
+        "segmentation" – {"clause_count": int, "clauses": [{clause_id, clause_text}, ...]}
+        "clause"       – {"index": int, "result": dict}, one per clause as
+                         soon as it is ready (completion order, not input order);
+                         result["usage"] holds the tokens and cost spent on it
+        "stats"        – run-level counters for the end-of-run summary,
+                         including "usage" (tokens and cost by stage and provider)
 
     Args:
         contract_text (str): Raw text of the contract.
-        output_path (str | None): Optional path to save results as JSON.
-
-    Returns:
-        list[dict]: One result dict per clause.
+        run_stats (dict | None): Optional dict also populated with the
+            run-level counters (clauses, cache hits, council reviews, ...).
+        parent_results (list | None): Results of an earlier version of this
+            contract. Clauses whose text is unchanged keep the parent's
+            verdict; only changed and new clauses go to the council. The
+            stats then carry a "revision" entry describing the alignment.
     """
+    with ACTIVE_CONTRACTS.track_inprogress():
+        async with contextlib.aclosing(
+            _pipeline_events(contract_text, run_stats, parent_results)
+        ) as events:
+            async for event in events:
+                yield event
+
+
+async def _pipeline_events(contract_text, run_stats, parent_results):
+    """Body of iter_pipeline."""
     logging.info("Starting pipeline...")
-    clauses = await segment_contract(contract_text)
+    ledger = UsageLedger(CONTRACT_TOKEN_BUDGET)
+    with usage_scope(ledger):
+        clauses = await run_stage("segmentation", segment_contract(contract_text))
     logging.info(f"Segmented contract into {len(clauses)} clauses.")
-    results = []
+    yield {
+        "event": "segmentation",
+        "data": {
+            "clause_count": len(clauses),
+            "clauses": [
+                {"clause_id": c["clause_id"], "clause_text": c["clause_text"]}
+                for c in clauses
+            ],
+        },
+    }
+
+    # Revision mode: carry over the parent's verdicts for unchanged clauses
+    reused = {}
+    revision = None
+    if parent_results is not None:
+        # difflib alignment is quadratic in the clause counts; keep it off the loop
+        reused, revision = await asyncio.to_thread(revise_from_parent, parent_results, clauses)
+        logging.info(
+            f"Revision: {len(reused)} clause(s) unchanged, {len(revision['modified'])} modified, "
+            f"{len(revision['new'])} new, {len(revision['removed'])} removed."
+        )
 
     # Track stats for end-of-run summary
     n_golden = 0
     n_council = 0
     n_errors = 0
+    n_verdict_hits = 0
+    n_started = 0         # clauses handed to process_clause; the rest are queued
+    stage_counters = {}   # filled in by pipeline stages (quorum exits, ...)
+
+    def precheck(index, clause_id, clause_text):
+        """
+        Settle a clause without the council where possible.
+
+        Returns (result, prefilter): result is None when the clause still
+        needs analysis; prefilter is the (score, best_type) pre-filter
+        estimate, or None when the pre-filter was not consulted.
+        """
+        nonlocal n_golden, n_verdict_hits
+        if index in reused:
+            if reused[index].get("golden_clause_detected"):
+                n_golden += 1
+            logging.info(f"Clause {clause_id} unchanged from the parent report. Reusing its verdict.")
+            return {**reused[index], "clause_id": clause_id, "clause_text": clause_text}, None
+
+        cached = cached_verdicts[index]
+        if cached is not None:
+            n_verdict_hits += 1
+            if cached.get("golden_clause_detected"):
+                n_golden += 1
+            logging.info(f"Verdict cache hit for clause {clause_id}. Skipping council.")
+            return {"clause_id": clause_id, **cached, "clause_text": clause_text}, None
+
+        if PREFILTER_MODE == "off":
+            return None, None
+
+        score, best_type = golden_score(clause_text)
+        if PREFILTER_MODE == "active" and score < PREFILTER_THRESHOLD:
+            bump(stage_counters, "prefilter_skips")
+            logging.info(
+                f"Pre-filter: clause {clause_id} scored {score:.3f} "
+                f"(< {PREFILTER_THRESHOLD}). Skipping council."
+            )
+            return non_golden_result(
+                clause_id, clause_text,
+                "No golden clause indicators found by the local pre-filter.",
+                confidence=round(1.0 - score, 3)
+            ), None
+        return None, (score, best_type)
+
+    def lookup_verdicts():
+        return [None if i in reused else get_verdict(c["clause_text"]) for i, c in enumerate(clauses)]
+
+    # Verdict cache reads are SQLite; do them all in one trip off the event loop
+    cached_verdicts = await asyncio.to_thread(lookup_verdicts)
+    prechecked = [precheck(i, c["clause_id"], c["clause_text"]) for i, c in enumerate(clauses)]
+
+    # Packed mode: clauses still needing analysis share one request per model
+    # per pack. Each pack starts when its first clause asks for it.
+    to_analyse = [i for i, (settled, _) in enumerate(prechecked) if settled is None]
+    packs = pack_clauses([clauses[i]["clause_text"] for i in to_analyse]) if PACKED_ANALYSIS else []
+    packs = [[to_analyse[j] for j in pack] for pack in packs]
+    pack_of = {index: pack for pack in packs for index in pack}
+    pack_tasks = {}
+
+    async def packed_outputs(index):
+        pack = pack_of[index]
+        key = pack[0]
+        if key not in pack_tasks:
+            logging.info(f"Running packed initial analysis for {len(pack)} clause(s)...")
+            with usage_scope(ledger, clauses=pack):
+                pack_tasks[key] = asyncio.ensure_future(run_stage(
+                    "packed_initial_analysis",
+                    packed_initial_analysis(
+                        [clauses[i]["clause_text"] for i in pack], run_stats=stage_counters
+                    ),
+                ))
+        # Shielded: one clause being cancelled must not cancel its pack-mates
+        outputs = await asyncio.shield(pack_tasks[key])
+        return outputs[pack.index(index)]
 
     async def process_clause(index, clause):
-        nonlocal n_golden, n_council, n_errors
+        nonlocal n_errors, n_started
+        n_started += 1
+        QUEUED_CLAUSES.dec()
         clause_id = clause["clause_id"]
         clause_text = clause["clause_text"]
         try:
             logging.info(f"Processing clause {index + 1}/{len(clauses)} (ID: {clause_id})...")
 
-            logging.info(f"Running initial analysis for clause {clause_id}...")
-            initial_outputs = await initial_analysis(clause_text)
+            settled, prefilter = prechecked[index]
+            if settled is not None:
+                return settled
 
-            # Guard: if every model failed, abort this clause rather than
-            # sending all-None data to arbitration.
-            valid_outputs = [v for v in initial_outputs.values() if v is not None]
-            if not valid_outputs:
+            if ledger.budget_exhausted():
+                bump(stage_counters, "budget_skipped_clauses")
                 raise ValueError(
-                    f"All models failed to return a response for clause {clause_id}."
+                    f"Token budget of {ledger.token_budget} tokens exhausted; clause not analysed."
                 )
 
-            # If no model detected golden clause → skip everything
-            if not should_proceed(initial_outputs):
-                logging.info(f"No golden clause detected for clause {clause_id}. Skipping.")
-                return {
-                    "clause_id": clause_id,
-                    "clause_text": clause_text,
-                    "golden_clause_detected": False,
-                    "golden_clause_type": None,
-                    "final_risk_score": 0.0,
-                    "risk_level": "None",
-                    "business_risk_if_ignored": None,
-                    "suggested_correction": None,
-                    "justification": "All models agree this clause is not a golden clause.",
-                    "confidence": 1.0
-                }
-
-            n_golden += 1
-            logging.info(f"Golden clause detected in {clause_id}. Proceeding...")
-
-            review_reason = needs_review(initial_outputs)
-            if review_reason:
-                logging.info(
-                    f"Disagreement detected in {clause_id} "
-                    f"(reason: {review_reason}). Starting Council Review..."
+            with usage_scope(ledger, clauses=(index,)):
+                initial_outputs = await packed_outputs(index) if index in pack_of else None
+                result = await analyse_clause(clause_id, clause_text, initial_outputs)
+            # A verdict reached without its council review is not worth caching
+            if not result.get("council_review_skipped"):
+                await asyncio.to_thread(
+                    store_verdict, clause_text, {k: v for k, v in result.items() if k != "clause_id"}
                 )
-                # review_round returns {"responses": anonymized, "reviews": {...}}
-                # We reuse its anonymization rather than running it a second time.
-                review_data = await review_round(clause_text, initial_outputs)
-                n_council += 1
-                council_data = review_data
-            else:
-                logging.info(f"Consensus reached for {clause_id}. Skipping Council Review.")
-                # Build a simple anonymized view for the arbitrator
-                label_letters = [chr(ord("A") + i) for i in range(len(initial_outputs))]
-                council_data = {
-                    "responses": {
-                        f"Response {l}": v
-                        for l, (_, v) in zip(label_letters, initial_outputs.items())
-                        if v is not None
-                    },
-                    "reviews": None
-                }
-
-            logging.info(f"Running arbitration for {clause_id}...")
-            final = await arbitration(clause_text, council_data)
-
-            if not final:
-                raise ValueError(f"Arbitration failed for clause {clause_id}")
 
+            if PREFILTER_MODE == "shadow":
+                score, best_type = prefilter
+                looks_golden = score >= PREFILTER_THRESHOLD
+                llm_golden = bool(result.get("golden_clause_detected"))
+                if llm_golden == looks_golden:
+                    bump(stage_counters, "prefilter_agree")
+                else:
+                    bump(stage_counters, "prefilter_disagree")
+                    # Missed golden clauses are what the threshold must avoid
+                    if llm_golden:
+                        bump(stage_counters, "prefilter_missed_golden")
+                    logging.info(
+                        f"Pre-filter shadow: clause {clause_id} scored {score:.3f} "
+                        f"(best match {best_type}); LLM golden={llm_golden}, "
+                        f"pre-filter golden={looks_golden}."
+                    )
             logging.info(f"Finished processing clause {index + 1}.")
-            return {
-                "clause_id": clause_id,
-                **final
-            }
+            return result
         except Exception as e:
             n_errors += 1
             logging.error(f"Error processing clause {clause_id}: {str(e)}")
@@ -166,16 +287,100 @@ async def run_pipeline(contract_text, output_path=None):
                 "justification": f"Processing failed: {str(e)}"
             }
 
-    # Process clauses in configurable batches to balance speed and rate limits
-    for i in range(0, len(clauses), BATCH_SIZE):
-        batch = clauses[i:i + BATCH_SIZE]
-        tasks = [process_clause(i + j, clause) for j, clause in enumerate(batch)]
-        batch_results = await asyncio.gather(*tasks)
-        results.extend(batch_results)
+    async def analyse_clause(clause_id, clause_text, initial_outputs=None):
+        """
+        Run the full council for one clause; raises on failure.
+        initial_outputs, when given, are reused instead of a fresh initial analysis.
+        """
+        nonlocal n_golden, n_council
+        if initial_outputs is None:
+            logging.info(f"Running initial analysis for clause {clause_id}...")
+            initial_outputs = await run_stage(
+                "initial_analysis", initial_analysis(clause_text, run_stats=stage_counters)
+            )
+
+        # Guard: if every model failed, abort this clause rather than
+        # sending all-None data to arbitration.
+        valid_outputs = [v for v in initial_outputs.values() if v is not None]
+        if not valid_outputs:
+            raise ValueError(
+                f"All models failed to return a response for clause {clause_id}."
+            )
+
+        # If no model detected golden clause → skip everything
+        if not should_proceed(initial_outputs):
+            logging.info(f"No golden clause detected for clause {clause_id}. Skipping.")
+            return non_golden_result(
+                clause_id, clause_text,
+                "All models agree this clause is not a golden clause."
+            )
+
+        n_golden += 1
+        logging.info(f"Golden clause detected in {clause_id}. Proceeding...")
 
-        # Rate-limit buffer between batches (skip delay after the last batch)
-        if i + BATCH_SIZE < len(clauses):
-            await asyncio.sleep(INTER_BATCH_DELAY_SECS)
+        review_reason = needs_review(initial_outputs)
+        REVIEW_CHECKS.labels(review_reason or "consensus").inc()
+        # Running low on the token budget: arbitrate the initial analyses directly
+        review_skipped = bool(review_reason) and ledger.budget_low()
+        if review_reason and not review_skipped:
+            logging.info(
+                f"Disagreement detected in {clause_id} "
+                f"(reason: {review_reason}). Starting Council Review..."
+            )
+            # review_round returns {"responses": anonymized, "reviews": {...}}
+            # We reuse its anonymization rather than running it a second time.
+            review_data = await run_stage("review", review_round(clause_text, initial_outputs))
+            n_council += 1
+            council_data = review_data
+        else:
+            if review_skipped:
+                bump(stage_counters, "budget_review_skips")
+                logging.warning(
+                    f"Disagreement detected in {clause_id} (reason: {review_reason}) but only "
+                    f"{ledger.remaining()} of {ledger.token_budget} budgeted tokens are left. "
+                    f"Skipping Council Review."
+                )
+            else:
+                logging.info(f"Consensus reached for {clause_id}. Skipping Council Review.")
+            # Build a simple anonymized view for the arbitrator
+            label_letters = [chr(ord("A") + i) for i in range(len(initial_outputs))]
+            council_data = {
+                "responses": {
+                    f"Response {l}": v
+                    for l, (_, v) in zip(label_letters, initial_outputs.items())
+                    if v is not None
+                },
+                "reviews": None
+            }
+
+        logging.info(f"Running arbitration for {clause_id}...")
+        final = await run_stage("arbitration", arbitration(clause_text, council_data))
+
+        if not final:
+            raise ValueError(f"Arbitration failed for clause {clause_id}")
+
+        result = {
+            "clause_id": clause_id,
+            **final
+        }
+        if review_skipped:
+            result["council_review_skipped"] = True
+        return result
+
+    # Keep CLAUSE_CONCURRENCY clauses in flight and emit each result as it lands
+    results = []
+    QUEUED_CLAUSES.inc(len(clauses))
+    try:
+        async for index, result in iter_bounded(
+            clauses, process_clause, CLAUSE_CONCURRENCY, rate=CLAUSE_START_RATE
+        ):
+            result = {**result, "usage": ledger.clause_usage(index)}
+            results.append(result)
+            yield {"event": "clause", "data": {"index": index, "result": result}}
+    finally:
+        QUEUED_CLAUSES.dec(len(clauses) - n_started)
+        for task in pack_tasks.values():
+            task.cancel()
 
     # ── End-of-run summary ────────────────────────────────────────────────────
     risk_scores = [
@@ -185,12 +390,79 @@ async def run_pipeline(contract_text, output_path=None):
     ]
     avg_risk = sum(risk_scores) / len(risk_scores) if risk_scores else 0.0
 
+    verdict_hit_rate = n_verdict_hits / len(results) if results else 0.0
+    quorum_exits = stage_counters.get("quorum_exits", 0)
+    quorum_secs_saved = stage_counters.get("quorum_secs_saved", 0.0)
+    usage = ledger.summary()
+
     logging.info(
         f"Pipeline completed. | Clauses: {len(results)} | "
         f"Golden: {n_golden} | Council reviews: {n_council} | "
+        f"Verdict cache hits: {n_verdict_hits} ({verdict_hit_rate:.0%}) | "
+        f"Quorum exits: {quorum_exits} (>= {quorum_secs_saved:.1f}s saved) | "
+        f"Pre-filter ({PREFILTER_MODE}): {stage_counters.get('prefilter_skips', 0)} skipped, "
+        f"{stage_counters.get('prefilter_disagree', 0)} disagreed | "
+        f"Packed calls: {stage_counters.get('packed_calls', 0)} "
+        f"({stage_counters.get('packed_fallbacks', 0)} single-clause fallbacks) | "
+        f"Reused from parent: {len(reused)} | "
+        f"Tokens: {usage['total_tokens']} (${usage['cost_usd']:.4f}), "
+        f"{stage_counters.get('budget_review_skips', 0)} reviews and "
+        f"{stage_counters.get('budget_skipped_clauses', 0)} clauses skipped for budget | "
         f"Errors: {n_errors} | Avg risk score: {avg_risk:.2f}"
     )
 
+    stats = {
+        "clauses": len(results),
+        "golden": n_golden,
+        "council_reviews": n_council,
+        "errors": n_errors,
+        "verdict_cache_hits": n_verdict_hits,
+        "verdict_cache_hit_rate": verdict_hit_rate,
+        "quorum_exits": quorum_exits,
+        "quorum_secs_saved": round(quorum_secs_saved, 3),
+        "prefilter_mode": PREFILTER_MODE,
+        "prefilter_skips": stage_counters.get("prefilter_skips", 0),
+        "prefilter_agree": stage_counters.get("prefilter_agree", 0),
+        "prefilter_disagree": stage_counters.get("prefilter_disagree", 0),
+        "prefilter_missed_golden": stage_counters.get("prefilter_missed_golden", 0),
+        "packed_calls": stage_counters.get("packed_calls", 0),
+        "packed_fallbacks": stage_counters.get("packed_fallbacks", 0),
+        "avg_risk_score": avg_risk,
+        "budget_review_skips": stage_counters.get("budget_review_skips", 0),
+        "budget_skipped_clauses": stage_counters.get("budget_skipped_clauses", 0),
+        "usage": usage,
+    }
+    if revision is not None:
+        stats["revision"] = revision
+    if run_stats is not None:
+        run_stats.update(stats)
+    yield {"event": "stats", "data": stats}
+
+
+async def run_pipeline(contract_text, output_path=None, run_stats=None, parent_results=None):
+    """
+    Run the full contract analysis pipeline.
+
+    Args:
+        contract_text (str): Raw text of the contract.
+        output_path (str | None): Optional path to save results as JSON.
+        run_stats (dict | None): Optional dict populated with run-level
+            counters (clauses, cache hits, council reviews, ...).
+        parent_results (list | None): Results of an earlier version of this
+            contract whose unchanged clauses are reused (see iter_pipeline).
+
+    Returns:
+        list[dict]: One result dict per clause.
+    """
+    results = []
+    async for event in iter_pipeline(
+        contract_text, run_stats=run_stats, parent_results=parent_results
+    ):
+        if event["event"] == "segmentation":
+            results = [None] * event["data"]["clause_count"]
+        elif event["event"] == "clause":
+            results[event["data"]["index"]] = event["data"]["result"]
+
     # ── Optional output persistence ────────────────────────────────────────────
     if output_path:
         out = pathlib.Path(output_path)
@@ -0,0 +1,100 @@
+import logging
+import time
+from config.settings import AVAILABLE_MODELS, BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT_SECS
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+
+    closed    – calls flow; consecutive transient failures are counted
+    open      – after failure_threshold failures, calls fail fast for
+                reset_timeout seconds
+    half_open – one probe call is let through; success closes the
+                circuit, failure re-opens it
+    """
+
+    def __init__(self, name, failure_threshold, reset_timeout):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.times_opened = 0
+        self.rejected = 0
+        self.successes = 0
+        self.failures = 0
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call should not reach the provider."""
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuit for '{self.name}' is open; failing fast.")
+            self.state = HALF_OPEN
+            self.probe_in_flight = False
+            logging.info(f"Circuit for '{self.name}' half-open; sending a probe call.")
+
+        if self.state == HALF_OPEN:
+            if self.probe_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuit for '{self.name}' is half-open; probe in flight.")
+            self.probe_in_flight = True
+
+    def record_success(self):
+        self.successes += 1
+        self.consecutive_failures = 0
+        if self.state != CLOSED:
+            logging.info(f"Circuit for '{self.name}' closed; provider recovered.")
+        self.state = CLOSED
+        self.probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def release_probe(self):
+        """The call ended without telling us anything about provider health."""
+        self.probe_in_flight = False
+
+    def _open(self):
+        if self.state != OPEN:
+            self.times_opened += 1
+            logging.warning(
+                f"Circuit for '{self.name}' opened after {self.consecutive_failures} "
+                f"consecutive failures; failing fast for {self.reset_timeout:.0f}s."
+            )
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.probe_in_flight = False
+
+    def snapshot(self):
+        return {
+            "provider": self.name,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "successes": self.successes,
+            "failures": self.failures,
+        }
+
+
+BREAKERS = {
+    name: CircuitBreaker(name, BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT_SECS)
+    for name in AVAILABLE_MODELS
+}
+
+
+def breaker_snapshot():
+    return {name: breaker.snapshot() for name, breaker in BREAKERS.items()}
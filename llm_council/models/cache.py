@@ -0,0 +1,197 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from config.settings import (
+    LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_CACHE_MAX_BYTES, LLM_CACHE_TTL_SECS,
+    OPENAI_MODEL, CLAUDE_MODEL, GEMINI_MODEL,
+    OPENAI_TEMPERATURE, CLAUDE_TEMPERATURE, GEMINI_TEMPERATURE,
+)
+from core.metrics import CACHE_EVICTIONS, CACHE_LOOKUPS
+
+# Model identity per provider — part of every cache key so that upgrading a
+# model name or temperature in config/settings.py never serves stale answers.
+MODEL_IDENTITY = {
+    "openai": (OPENAI_MODEL, OPENAI_TEMPERATURE),
+    "claude": (CLAUDE_MODEL, CLAUDE_TEMPERATURE),
+    "gemini": (GEMINI_MODEL, GEMINI_TEMPERATURE),
+}
+
+
+class SQLiteLRUCache:
+    """
+    Small persistent key/value store for JSON-serialisable values.
+
+    - Entries expire after ttl_secs (0 disables expiry)
+    - Least-recently-used entries are evicted once the stored payload
+      exceeds max_bytes
+    - Hit/miss/eviction counters are kept in memory for the process and
+      exported to /metrics, labelled with the table name
+    - A hit refreshes accessed_at at most once per touch_interval seconds,
+      so repeated hits do not each cost a write
+    """
+
+    touch_interval = 60.0
+
+    def __init__(self, path, max_bytes, ttl_secs=0, table="entries"):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_secs = ttl_secs
+        self.table = table
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_accessed "
+                f"ON {self.table} (accessed_at)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                f"SELECT value, created_at, accessed_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._count_miss()
+                return None
+            value, created_at, accessed_at = row
+            if self.ttl_secs and now - created_at > self.ttl_secs:
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                conn.commit()
+                self._count_miss()
+                return None
+            if now - accessed_at > self.touch_interval:
+                conn.execute(
+                    f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+                conn.commit()
+            self.hits += 1
+            CACHE_LOOKUPS.labels(self.table, "hit").inc()
+        return json.loads(value)
+
+    def _count_miss(self):
+        self.misses += 1
+        CACHE_LOOKUPS.labels(self.table, "miss").inc()
+
+    def set(self, key, value):
+        """Store a JSON-serialisable value and evict LRU entries if over budget."""
+        payload = json.dumps(value, default=str)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} "
+                "(key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now)
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn):
+        total = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Walk from least-recently-used until we are back under budget
+        to_delete = []
+        for key, size in conn.execute(
+            f"SELECT key, size FROM {self.table} ORDER BY accessed_at ASC"
+        ):
+            if total <= self.max_bytes:
+                break
+            to_delete.append((key,))
+            total -= size
+        conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", to_delete)
+        self.evictions += len(to_delete)
+        CACHE_EVICTIONS.labels(self.table).inc(len(to_delete))
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(f"DELETE FROM {self.table}")
+            conn.commit()
+
+    def purge_except_prefix(self, prefix):
+        """Drop every entry whose key does not start with prefix; returns the count."""
+        with self._lock:
+            conn = self._connect()
+            cur = conn.execute(
+                f"DELETE FROM {self.table} WHERE substr(key, 1, ?) != ?",
+                (len(prefix), prefix)
+            )
+            conn.commit()
+            return cur.rowcount
+
+    def stats(self):
+        with self._lock:
+            conn = self._connect()
+            entries, size = conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
+
+
+response_cache = SQLiteLRUCache(
+    LLM_CACHE_PATH,
+    max_bytes=LLM_CACHE_MAX_BYTES,
+    ttl_secs=LLM_CACHE_TTL_SECS,
+    table="llm_responses",
+)
+
+
+def response_cache_key(provider, prompt):
+    """Content-addressed key: provider, model name, temperature and prompt hash."""
+    model_name, temperature = MODEL_IDENTITY.get(provider, (None, None))
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return f"{provider}:{model_name}:{temperature}:{prompt_hash}"
+
+
+def get_cached_response(provider, prompt):
+    if not LLM_CACHE_ENABLED or provider is None:
+        return None
+    try:
+        return response_cache.get(response_cache_key(provider, prompt))
+    except sqlite3.Error as e:
+        logging.warning(f"LLM cache read failed, calling provider instead: {e}")
+        return None
+
+
+def store_cached_response(provider, prompt, raw):
+    if not LLM_CACHE_ENABLED or provider is None:
+        return
+    try:
+        response_cache.set(response_cache_key(provider, prompt), raw)
+    except (sqlite3.Error, TypeError, ValueError) as e:
+        logging.warning(f"LLM cache write failed: {e}")
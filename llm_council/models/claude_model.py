@@ -1,8 +1,11 @@
 import json
 from functools import lru_cache
 from anthropic import AsyncAnthropic
-from models.utils import clean_json
-from config.settings import CLAUDE_MODEL, CLAUDE_MAX_TOKENS
+from models.utils import clean_json, split_cacheable_prefix
+from models.limiter import rate_limited
+from models.recording import recorded
+from models.usage import record_usage
+from config.settings import CLAUDE_MODEL, CLAUDE_MAX_TOKENS, CLAUDE_TEMPERATURE
 
 
 @lru_cache(maxsize=4)
@@ -11,14 +14,38 @@ def _get_client(api_key: str) -> AsyncAnthropic:
     return AsyncAnthropic(api_key=api_key)
 
 
+def _content(prompt: str):
+    """Message content, with the static prompt prefix marked for Anthropic's prompt cache."""
+    prefix, rest = split_cacheable_prefix(prompt)
+    if prefix is None:
+        return prompt
+    return [
+        {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": rest},
+    ]
+
+
+@rate_limited("claude")
+@recorded("claude")
 async def call_claude(prompt: str, api_key: str):
     client = _get_client(api_key)
 
     message = await client.messages.create(
         model=CLAUDE_MODEL,
         max_tokens=CLAUDE_MAX_TOKENS,   # required by Anthropic API; controlled via settings.py
-        temperature=0,
-        messages=[{"role": "user", "content": prompt}]
+        temperature=CLAUDE_TEMPERATURE,
+        messages=[{"role": "user", "content": _content(prompt)}]
+    )
+
+    usage = message.usage
+    cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+    cache_write = getattr(usage, "cache_creation_input_tokens", None) or 0
+    record_usage(
+        "claude",
+        input_tokens=usage.input_tokens + cache_read + cache_write,
+        output_tokens=usage.output_tokens,
+        cached_tokens=cache_read,
+        cache_write_tokens=cache_write,
     )
 
     raw_text = message.content[0].text
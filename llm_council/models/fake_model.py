@@ -0,0 +1,194 @@
+"""
+Local stand-in for the LLM providers, for exercising retries, circuit
+breakers and pipeline throughput without network calls or API spend.
+
+    from models.fake_model import install_fake_providers
+    fakes = install_fake_providers(latency=0.05, failure_rate=0.1)
+    fakes["claude"].down = True      # simulate an outage
+"""
+import asyncio
+import json
+import random
+import re
+from types import SimpleNamespace
+from config.golden_clauses import GOLDEN_CLAUSES
+from models import registry
+from models.limiter import rate_limited
+from models.recording import recorded
+from models.usage import record_usage
+
+# Keywords that make the fake analysts call a clause golden, per clause type
+_GOLDEN_KEYWORDS = {
+    "Payment Terms": ("payment", "invoice", "fee"),
+    "Term and Termination": ("terminat", "renewal"),
+    "Scope of Services": ("scope", "deliverable"),
+    "Confidentiality": ("confidential",),
+    "Limitation of Liability": ("liability", "consequential"),
+    "Indemnity": ("indemn",),
+    "Intellectual Property": ("intellectual property",),
+    "Service Levels": ("service level", "uptime", "response time"),
+    "Governing Law & Jurisdiction": ("governing law", "jurisdiction"),
+    "Force Majeure": ("force majeure",),
+}
+
+
+class FakeProviderError(Exception):
+    """Transient server-side failure injected by a fake provider."""
+    status_code = 503
+
+
+class FakeRateLimitError(FakeProviderError):
+    """429 injected by a fake provider, optionally carrying a Retry-After header."""
+    status_code = 429
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        headers = {} if retry_after is None else {"retry-after": str(retry_after)}
+        self.response = SimpleNamespace(headers=headers)
+
+
+def _section(prompt, label):
+    """Text following the last `label:` line of a prompt."""
+    idx = prompt.rfind(f"\n{label}:\n")
+    return prompt[idx + len(label) + 3:] if idx >= 0 else prompt
+
+
+def _clause_type(clause_text):
+    text = clause_text.lower()
+    for clause_type, keywords in _GOLDEN_KEYWORDS.items():
+        if clause_type in GOLDEN_CLAUSES and any(k in text for k in keywords):
+            return clause_type
+    return None
+
+
+def _base_score(clause_text, clause_type):
+    return 2.0 + (sum(map(ord, clause_text)) % 7) if clause_type else 0.0
+
+
+def _fake_analysis(clause_text, rng, disagreement_rate):
+    # Initial analysis; occasionally disagree enough to trigger a council review
+    clause_type = _clause_type(clause_text)
+    score = _base_score(clause_text, clause_type)
+    if clause_type and rng.random() < disagreement_rate:
+        score = min(10.0, score + 4.0)
+    return {
+        "golden_clause_detected": clause_type is not None,
+        "golden_clause_type": clause_type,
+        "risk_score": score,
+        "balanced": True,
+        "justification": "Simulated analysis.",
+        "key_risk_indicators": [],
+    }
+
+
+def fake_response(prompt, rng, disagreement_rate=0.0):
+    """Schema-valid JSON for whichever pipeline prompt this is."""
+    if "expert legal contract parser" in prompt:
+        body = _section(prompt, "Contract")
+        paragraphs = [p.strip() for p in re.split(r"\n\s*\n", body) if p.strip()]
+        return [
+            {"clause_id": i + 1, "clause_heading": p.splitlines()[0][:60], "clause_text": p}
+            for i, p in enumerate(paragraphs)
+        ]
+
+    if "anonymized legal risk analyses" in prompt:
+        labels = sorted(set(re.findall(r"^(Response [A-Z]):", prompt, re.MULTILINE)))
+        return {
+            "evaluation": {l: {"strengths": "Clear reasoning.", "weaknesses": "Limited detail."} for l in labels},
+            "ranking": {str(i + 1): l for i, l in enumerate(labels)},
+        }
+
+    if "several contract clauses at once" in prompt:
+        blocks = re.split(r"^\[Clause (\d+)\]\n", _section(prompt, "Clauses"), flags=re.MULTILINE)
+        return [
+            {"clause_index": int(index), **_fake_analysis(text.strip(), rng, disagreement_rate)}
+            for index, text in zip(blocks[1::2], blocks[2::2])
+        ]
+
+    clause_text = _section(prompt, "Clause").split("\nCouncil Data:\n")[0].strip()
+    clause_type = _clause_type(clause_text)
+    base_score = _base_score(clause_text, clause_type)
+
+    if "final adjudicator" in prompt:
+        score = base_score
+        return {
+            "clause_text": clause_text,
+            "golden_clause_detected": clause_type is not None,
+            "golden_clause_type": clause_type,
+            "final_risk_score": score,
+            "risk_level": "Low" if score <= 3 else "Moderate" if score <= 6 else "High",
+            "business_risk_if_ignored": "Simulated business risk.",
+            "suggested_correction": clause_text,
+            "justification": "Simulated arbitration.",
+            "confidence": 0.8,
+        }
+
+    return _fake_analysis(clause_text, rng, disagreement_rate)
+
+
+class FakeProvider:
+    """
+    Async callable with the same signature as call_openai/call_claude/call_gemini.
+
+    latency may be a number of seconds or a callable taking a random.Random
+    and returning seconds. failure_rate and rate_limit_rate inject transient
+    errors; setting .down = True makes every call fail until cleared.
+    Successful calls report usage like the real wrappers, estimating ~4
+    characters per token.
+    """
+
+    def __init__(self, name, latency=0.0, failure_rate=0.0, rate_limit_rate=0.0,
+                 retry_after=None, disagreement_rate=0.0, seed=None, responder=None):
+        self.name = name
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.disagreement_rate = disagreement_rate
+        self.responder = responder
+        self.rng = random.Random(seed)
+        self.down = False
+        self.calls = 0
+        self.errors = 0
+
+    async def __call__(self, prompt, api_key=None):
+        self.calls += 1
+        delay = self.latency(self.rng) if callable(self.latency) else self.latency
+        if delay:
+            await asyncio.sleep(delay)
+
+        if self.down or self.rng.random() < self.failure_rate:
+            self.errors += 1
+            raise FakeProviderError(f"{self.name}: simulated provider failure")
+        if self.rng.random() < self.rate_limit_rate:
+            self.errors += 1
+            raise FakeRateLimitError(f"{self.name}: simulated 429", retry_after=self.retry_after)
+
+        if self.responder:
+            response = self.responder(prompt)
+        else:
+            response = fake_response(prompt, self.rng, self.disagreement_rate)
+        record_usage(
+            self.name,
+            input_tokens=len(prompt) // 4,
+            output_tokens=len(json.dumps(response)) // 4,
+        )
+        return response
+
+
+def install_fake_providers(names=None, seed=None, throttled=False, **kwargs):
+    """
+    Replace entries of MODEL_REGISTRY (and their API keys) with FakeProviders.
+    With throttled=True each fake is wrapped like the real providers, so calls
+    go through its rate limiter and recorder.
+    Returns {name: FakeProvider} so callers can inspect or reconfigure them.
+    """
+    fakes = {}
+    for i, name in enumerate(names or list(registry.MODEL_REGISTRY)):
+        fake = FakeProvider(name, seed=None if seed is None else seed + i, **kwargs)
+        registry.MODEL_REGISTRY[name] = (
+            rate_limited(name)(recorded(name)(fake)) if throttled else fake
+        )
+        registry.API_KEY_MAP[name] = lambda: "fake-key"
+        fakes[name] = fake
+    return fakes
@@ -1,8 +1,12 @@
 import json
 from functools import lru_cache
 from google import genai
+from google.genai import types
 from models.utils import clean_json
-from config.settings import GEMINI_MODEL
+from models.limiter import rate_limited
+from models.recording import recorded
+from models.usage import record_usage
+from config.settings import GEMINI_MODEL, GEMINI_TEMPERATURE
 
 
 @lru_cache(maxsize=4)
@@ -11,13 +15,27 @@ def _get_client(api_key: str) -> genai.Client:
     return genai.Client(api_key=api_key)
 
 
+@rate_limited("gemini")
+@recorded("gemini")
 async def call_gemini(prompt: str, api_key: str):
     client = _get_client(api_key)
 
+    # Gemini 2.5 models cache repeated prompt prefixes implicitly
     response = await client.aio.models.generate_content(
         model=GEMINI_MODEL,
-        contents=prompt
+        contents=prompt,
+        config=types.GenerateContentConfig(temperature=GEMINI_TEMPERATURE)
     )
 
+    usage = response.usage_metadata
+    if usage is not None:
+        record_usage(
+            "gemini",
+            input_tokens=usage.prompt_token_count,
+            # Thinking tokens are billed as output
+            output_tokens=(usage.candidates_token_count or 0) + (usage.thoughts_token_count or 0),
+            cached_tokens=usage.cached_content_token_count,
+        )
+
     raw_text = response.text
-    return json.loads(clean_json(raw_text))
\ No newline at end of file
+    return json.loads(clean_json(raw_text))
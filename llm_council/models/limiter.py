@@ -0,0 +1,173 @@
+import asyncio
+import functools
+import logging
+import time
+from contextlib import asynccontextmanager
+from config.settings import PROVIDER_LIMITS, LIMITER_OUTPUT_TOKEN_ESTIMATE
+from models.utils import is_rate_limit_error
+
+
+def estimate_tokens(prompt: str) -> int:
+    """Rough token estimate for budgeting: ~4 characters per token plus expected output."""
+    return len(prompt) // 4 + LIMITER_OUTPUT_TOKEN_ESTIMATE
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding up to `per_minute` units."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def available(self):
+        self._refill()
+        return self.tokens
+
+    def drain(self):
+        self._refill()
+        self.tokens = 0.0
+
+    async def acquire(self, amount, lock):
+        # Requests bigger than the bucket would never fit; let them through once full
+        amount = min(float(amount), self.capacity)
+        async with lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class ProviderLimiter:
+    """
+    Process-wide throttle for one LLM provider.
+
+    - Token buckets cap requests per minute and estimated tokens per minute
+    - Concurrency follows AIMD: +1 slot per window of successful calls,
+      halved (at most once per decrease_interval seconds) when the provider
+      returns a 429
+    """
+
+    decrease_interval = 1.0
+
+    def __init__(self, name, rpm, tpm, max_concurrency, min_concurrency=1):
+        self.name = name
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency = float(max(min_concurrency, max_concurrency // 2))
+        self.in_flight = 0
+        self.waiting = 0
+        self.successes = 0
+        self.rate_limited = 0
+        self._last_decrease = 0.0
+        self._loop = None
+
+    def _bind_loop(self):
+        # asyncio primitives belong to one event loop; rebuild them if the
+        # limiter is reused from a new loop (notebooks, repeated asyncio.run)
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._slots = asyncio.Condition()
+            self._request_lock = asyncio.Lock()
+            self._token_lock = asyncio.Lock()
+            self.in_flight = 0
+
+    @asynccontextmanager
+    async def slot(self, prompt):
+        self._bind_loop()
+        acquired = False
+        self.waiting += 1
+        try:
+            async with self._slots:
+                await self._slots.wait_for(lambda: self.in_flight < int(self.concurrency))
+                self.in_flight += 1
+                acquired = True
+            await self.requests.acquire(1, self._request_lock)
+            await self.tokens.acquire(estimate_tokens(prompt), self._token_lock)
+        except BaseException:
+            if acquired:
+                await self._release()
+            raise
+        finally:
+            self.waiting -= 1
+
+        try:
+            yield
+        finally:
+            await self._release()
+
+    async def _release(self):
+        async with self._slots:
+            self.in_flight -= 1
+            self._slots.notify_all()
+
+    def on_success(self):
+        self.successes += 1
+        self.concurrency = min(self.max_concurrency, self.concurrency + 1.0 / self.concurrency)
+
+    def on_rate_limited(self):
+        self.rate_limited += 1
+        now = time.monotonic()
+        if now - self._last_decrease < self.decrease_interval:
+            return
+        self._last_decrease = now
+        self.concurrency = max(self.min_concurrency, self.concurrency / 2)
+        self.requests.drain()
+        logging.warning(
+            f"{self.name}: rate limited, concurrency reduced to {int(self.concurrency)}."
+        )
+
+    def snapshot(self):
+        return {
+            "provider": self.name,
+            "concurrency_limit": int(self.concurrency),
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "requests_available": round(self.requests.available(), 1),
+            "requests_per_minute": self.requests.capacity,
+            "tokens_available": round(self.tokens.available()),
+            "tokens_per_minute": self.tokens.capacity,
+            "successes": self.successes,
+            "rate_limited": self.rate_limited,
+        }
+
+
+LIMITERS = {
+    name: ProviderLimiter(name, **limits)
+    for name, limits in PROVIDER_LIMITS.items()
+}
+
+
+def limiter_snapshot():
+    return {name: limiter.snapshot() for name, limiter in LIMITERS.items()}
+
+
+def rate_limited(provider):
+    """Decorator routing a model wrapper through the shared limiter for `provider`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(prompt, *args, **kwargs):
+            limiter = LIMITERS[provider]
+            async with limiter.slot(prompt):
+                try:
+                    result = await fn(prompt, *args, **kwargs)
+                except Exception as e:
+                    if is_rate_limit_error(e):
+                        limiter.on_rate_limited()
+                    raise
+            limiter.on_success()
+            return result
+        return wrapper
+    return decorator
@@ -1,8 +1,11 @@
 import json
 from functools import lru_cache
 from openai import AsyncOpenAI
-from models.utils import clean_json
-from config.settings import OPENAI_MODEL
+from models.utils import clean_json, split_cacheable_prefix, prefix_cache_key
+from models.limiter import rate_limited
+from models.recording import recorded
+from models.usage import record_usage
+from config.settings import OPENAI_MODEL, OPENAI_TEMPERATURE
 
 
 @lru_cache(maxsize=4)
@@ -11,14 +14,32 @@ def _get_client(api_key: str) -> AsyncOpenAI:
     return AsyncOpenAI(api_key=api_key)
 
 
+@rate_limited("openai")
+@recorded("openai")
 async def call_openai(prompt: str, api_key: str):
     client = _get_client(api_key)
 
+    # OpenAI caches prompt prefixes automatically; the key routes calls that
+    # share a prefix to the same cache.
+    prefix, _ = split_cacheable_prefix(prompt)
+    extra = {"prompt_cache_key": prefix_cache_key(prefix)} if prefix else {}
+
     response = await client.chat.completions.create(
         model=OPENAI_MODEL,
-        temperature=0,
-        messages=[{"role": "user", "content": prompt}]
+        temperature=OPENAI_TEMPERATURE,
+        messages=[{"role": "user", "content": prompt}],
+        **extra
     )
 
+    usage = response.usage
+    if usage is not None:
+        details = getattr(usage, "prompt_tokens_details", None)
+        record_usage(
+            "openai",
+            input_tokens=usage.prompt_tokens,
+            output_tokens=usage.completion_tokens,
+            cached_tokens=getattr(details, "cached_tokens", None) or 0,
+        )
+
     raw_text = response.choices[0].message.content
     return json.loads(clean_json(raw_text))
@@ -0,0 +1,210 @@
+"""
+Record provider calls to a JSONL corpus and replay them offline.
+
+With LLM_RECORD_PATH set, every call through call_openai / call_claude /
+call_gemini appends one line: provider, model, prompt hash, observed latency
+and the parsed response with its reported token usage, the error, or that
+the call was cancelled. ReplayProvider serves a corpus back by prompt hash,
+so real contracts can be rerun without API calls:
+
+    from models.recording import install_replay_providers
+    replays = install_replay_providers("recordings/llm_calls.jsonl", timing="compressed", speedup=20)
+
+Calls served from the LLM response cache never reach the wrappers, so record
+with LLM_CACHE_ENABLED = False for a complete corpus.
+"""
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import random
+import statistics
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+from config.settings import (
+    LLM_RECORD_PATH, OPENAI_MODEL, CLAUDE_MODEL, GEMINI_MODEL,
+)
+from models.utils import is_rate_limit_error, retry_after_secs
+from models.usage import capture_usage, record_usage
+
+_MODEL_NAMES = {"openai": OPENAI_MODEL, "claude": CLAUDE_MODEL, "gemini": GEMINI_MODEL}
+_write_lock = threading.Lock()
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def _append(path, record):
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    with _write_lock:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def recorded(provider):
+    """Decorator appending each call of a model wrapper to LLM_RECORD_PATH (when set)."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(prompt, *args, **kwargs):
+            if not LLM_RECORD_PATH:
+                return await fn(prompt, *args, **kwargs)
+            record = {
+                "provider": provider,
+                "model": _MODEL_NAMES.get(provider),
+                "prompt_sha256": prompt_hash(prompt),
+                "started_at": time.time(),
+            }
+            started = time.perf_counter()
+            try:
+                with capture_usage() as usage:
+                    result = await fn(prompt, *args, **kwargs)
+            except Exception as e:
+                record["latency_secs"] = round(time.perf_counter() - started, 4)
+                record["error"] = {
+                    "type": type(e).__name__,
+                    "message": str(e),
+                    "status_code": 429 if is_rate_limit_error(e) else getattr(e, "status_code", None),
+                    "retry_after_secs": retry_after_secs(e),
+                }
+                _append(LLM_RECORD_PATH, record)
+                raise
+            except asyncio.CancelledError:
+                # e.g. the analysis quorum was reached without this model
+                record["latency_secs"] = round(time.perf_counter() - started, 4)
+                record["cancelled"] = True
+                _append(LLM_RECORD_PATH, record)
+                raise
+            record["latency_secs"] = round(time.perf_counter() - started, 4)
+            record["response"] = result
+            record["usage"] = usage[0] if usage else None
+            _append(LLM_RECORD_PATH, record)
+            return result
+        return wrapper
+    return decorator
+
+
+def load_recordings(path):
+    """{provider: {prompt_sha256: [record, ...]}} in recording order."""
+    corpus = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                corpus.setdefault(record["provider"], {}).setdefault(
+                    record["prompt_sha256"], []
+                ).append(record)
+    return corpus
+
+
+class ReplayMissError(Exception):
+    """No recording exists for this prompt."""
+
+
+class ReplayedProviderError(Exception):
+    """
+    A recorded provider failure, raised again on replay. Raised as a subclass
+    named after the original exception type, so retry and circuit-breaker
+    classification (which go by type name and status code) match the recording.
+    """
+
+    def __init__(self, message, status_code=None, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        headers = {} if retry_after is None else {"retry-after": str(retry_after)}
+        self.response = SimpleNamespace(headers=headers)
+
+
+@functools.lru_cache(maxsize=None)
+def _replayed_error_class(type_name):
+    return type(type_name, (ReplayedProviderError,), {})
+
+
+class ReplayProvider:
+    """
+    Async callable with the same signature as call_openai/call_claude/call_gemini,
+    serving recorded responses by prompt hash.
+
+    Repeated prompts get their recordings in order (the last one repeats once
+    they run out), so retried failures replay as they happened. A call that
+    was cancelled while recording waits to be cancelled again. timing is
+    "faithful" (sleep the recorded latency), "compressed" (recorded latency /
+    speedup) or "none". Recorded token usage is reported again. On a prompt
+    that was never recorded, on_miss="error" raises ReplayMissError and
+    on_miss="fake" answers like FakeProvider after the median recorded latency.
+    """
+
+    def __init__(self, name, recordings, timing="faithful", speedup=10.0, on_miss="error"):
+        self.name = name
+        self.recordings = {h: deque(records) for h, records in recordings.items()}
+        self.timing = timing
+        self.speedup = speedup
+        self.on_miss = on_miss
+        latencies = [r["latency_secs"] for records in recordings.values() for r in records]
+        self.miss_latency = statistics.median(latencies) if latencies else 0.0
+        self.calls = 0
+        self.errors = 0
+        self.misses = 0
+
+    def _delay(self, latency):
+        if self.timing == "faithful":
+            return latency
+        if self.timing == "compressed":
+            return latency / self.speedup
+        return 0.0
+
+    async def __call__(self, prompt, api_key=None):
+        self.calls += 1
+        queue = self.recordings.get(prompt_hash(prompt))
+        if not queue:
+            self.misses += 1
+            if self.on_miss != "fake":
+                raise ReplayMissError(f"{self.name}: no recording for this prompt")
+            from models.fake_model import fake_response
+            await asyncio.sleep(self._delay(self.miss_latency))
+            return fake_response(prompt, random.Random(0))
+
+        record = queue.popleft() if len(queue) > 1 else queue[0]
+        delay = self._delay(record.get("latency_secs", 0.0))
+        if record.get("cancelled"):
+            # The pipeline gave up on this call while recording; it should do so
+            # again, but a changed pipeline might not, so do not wait forever
+            await asyncio.sleep(max(10 * delay, 1.0))
+            self.misses += 1
+            raise ReplayMissError(f"{self.name}: this call was cancelled when recorded")
+        if delay:
+            await asyncio.sleep(delay)
+
+        error = record.get("error")
+        if error:
+            self.errors += 1
+            raise _replayed_error_class(error["type"])(
+                error["message"],
+                status_code=error.get("status_code"),
+                retry_after=error.get("retry_after_secs"),
+            )
+        if record.get("usage"):
+            record_usage(self.name, **record["usage"])
+        return record["response"]
+
+
+def install_replay_providers(path, names=None, **kwargs):
+    """
+    Replace entries of MODEL_REGISTRY (and their API keys) with ReplayProviders
+    serving the corpus at path. Returns {name: ReplayProvider}.
+    """
+    from models import registry   # imports the wrappers, which import this module
+    corpus = load_recordings(path)
+    replays = {}
+    for name in names or list(registry.MODEL_REGISTRY):
+        replay = ReplayProvider(name, corpus.get(name, {}), **kwargs)
+        registry.MODEL_REGISTRY[name] = replay
+        registry.API_KEY_MAP[name] = lambda: "replay-key"
+        replays[name] = replay
+    return replays
@@ -0,0 +1,204 @@
+import contextvars
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from config.settings import (
+    AVAILABLE_MODELS, OPENAI_MODEL, CLAUDE_MODEL, GEMINI_MODEL, MODEL_PRICES,
+    CONTRACT_TOKEN_RESERVE,
+)
+
+PROVIDER_MODELS = {"openai": OPENAI_MODEL, "claude": CLAUDE_MODEL, "gemini": GEMINI_MODEL}
+
+
+def usage_cost(provider, input_tokens=0, output_tokens=0, cached_tokens=0, cache_write_tokens=0):
+    """USD cost of one call's reported usage, priced from MODEL_PRICES (0 for unknown models)."""
+    prices = MODEL_PRICES.get(PROVIDER_MODELS.get(provider))
+    if not prices:
+        return 0.0
+    input_tokens, output_tokens = input_tokens or 0, output_tokens or 0
+    cached_tokens, cache_write_tokens = cached_tokens or 0, cache_write_tokens or 0
+    uncached = max(input_tokens - cached_tokens - cache_write_tokens, 0)
+    return (
+        uncached * prices["input"]
+        + cached_tokens * prices.get("cached_input", prices["input"])
+        + cache_write_tokens * prices.get("cache_write", prices["input"])
+        + output_tokens * prices["output"]
+    ) / 1_000_000
+
+
+class ProviderUsage:
+    """
+    Running token counters for one provider, as reported by its API.
+
+    input_tokens counts every prompt token, including those served from the
+    provider's prompt cache (cached_tokens) and those written to it
+    (cache_write_tokens, Anthropic only).
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cached_tokens = 0
+        self.cache_write_tokens = 0
+        self.cost_usd = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, input_tokens=0, output_tokens=0, cached_tokens=0, cache_write_tokens=0):
+        cost = usage_cost(self.name, input_tokens, output_tokens, cached_tokens, cache_write_tokens)
+        with self._lock:
+            self.calls += 1
+            self.input_tokens += input_tokens or 0
+            self.output_tokens += output_tokens or 0
+            self.cached_tokens += cached_tokens or 0
+            self.cache_write_tokens += cache_write_tokens or 0
+            self.cost_usd += cost
+
+    def snapshot(self):
+        return {
+            "provider": self.name,
+            "calls": self.calls,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cache_write_tokens": self.cache_write_tokens,
+            "cached_input_ratio": (
+                round(self.cached_tokens / self.input_tokens, 3) if self.input_tokens else 0.0
+            ),
+            "cost_usd": round(self.cost_usd, 6),
+        }
+
+
+USAGE = {name: ProviderUsage(name) for name in AVAILABLE_MODELS}
+
+
+# ─── Per-contract accounting ──────────────────────────────────────────────────
+
+_COUNTERS = ("calls", "input_tokens", "output_tokens", "cached_tokens", "cache_write_tokens")
+
+
+def _empty_totals():
+    return {**{key: 0 for key in _COUNTERS}, "cost_usd": 0.0}
+
+
+def _rounded(totals):
+    out = {key: int(round(totals[key])) for key in _COUNTERS}
+    out["total_tokens"] = out["input_tokens"] + out["output_tokens"]
+    out["cost_usd"] = round(totals["cost_usd"], 6)
+    return out
+
+
+class UsageLedger:
+    """
+    Token usage and cost of one contract run, broken down by pipeline stage,
+    provider and clause, with an optional token budget.
+
+    Usage of a call made for several clauses at once (packed analysis) is
+    shared equally between them, so clause figures may carry fractions
+    until they are rounded for output.
+    """
+
+    def __init__(self, token_budget=None, reserve=CONTRACT_TOKEN_RESERVE):
+        self.token_budget = token_budget
+        self.reserve = reserve
+        self.totals = _empty_totals()
+        self.by_stage = {}
+        self.by_provider = {}
+        self.by_clause = {}
+
+    def record(self, provider, stage, clauses, **counts):
+        counts = {key: counts.get(key) or 0 for key in _COUNTERS[1:]}
+        cost = usage_cost(provider, **counts)
+        buckets = [
+            (self.totals, 1.0),
+            (self.by_stage.setdefault(stage or "other", _empty_totals()), 1.0),
+            (self.by_provider.setdefault(provider, _empty_totals()), 1.0),
+        ]
+        for clause in clauses or ():
+            buckets.append((self.by_clause.setdefault(clause, _empty_totals()), 1.0 / len(clauses)))
+        for totals, share in buckets:
+            totals["calls"] += share
+            for key, value in counts.items():
+                totals[key] += value * share
+            totals["cost_usd"] += cost * share
+
+    @property
+    def tokens_used(self):
+        return self.totals["input_tokens"] + self.totals["output_tokens"]
+
+    def remaining(self):
+        """Tokens left in the budget, or None without one."""
+        if self.token_budget is None:
+            return None
+        return self.token_budget - self.tokens_used
+
+    def budget_low(self):
+        """True once less than the reserve fraction of the budget is left."""
+        remaining = self.remaining()
+        return remaining is not None and remaining < self.token_budget * self.reserve
+
+    def budget_exhausted(self):
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def clause_usage(self, clause):
+        return _rounded(self.by_clause.get(clause) or _empty_totals())
+
+    def summary(self):
+        return {
+            **_rounded(self.totals),
+            "by_stage": {stage: _rounded(t) for stage, t in self.by_stage.items()},
+            "by_provider": {provider: _rounded(t) for provider, t in self.by_provider.items()},
+            "token_budget": self.token_budget,
+            "budget_remaining": self.remaining(),
+        }
+
+
+UsageScope = namedtuple("UsageScope", ["ledger", "stage", "clauses"])
+_scope = contextvars.ContextVar("usage_scope", default=UsageScope(None, None, None))
+_captured = contextvars.ContextVar("captured_usage", default=None)
+
+
+@contextmanager
+def usage_scope(ledger=None, stage=None, clauses=None):
+    """
+    Attribute usage reported by provider calls made inside the block, and by
+    tasks started there, to ledger under stage and the given clause indices.
+    Arguments left as None are inherited from the enclosing scope.
+    """
+    parent = _scope.get()
+    token = _scope.set(UsageScope(
+        ledger if ledger is not None else parent.ledger,
+        stage if stage is not None else parent.stage,
+        tuple(clauses) if clauses is not None else parent.clauses,
+    ))
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+@contextmanager
+def capture_usage():
+    """Collect the counts passed to record_usage inside the block into the yielded list."""
+    captured = []
+    token = _captured.set(captured)
+    try:
+        yield captured
+    finally:
+        _captured.reset(token)
+
+
+def record_usage(provider, **counts):
+    USAGE.setdefault(provider, ProviderUsage(provider)).record(**counts)
+    captured = _captured.get()
+    if captured is not None:
+        captured.append(counts)
+    scope = _scope.get()
+    if scope.ledger is not None:
+        scope.ledger.record(provider, scope.stage, scope.clauses, **counts)
+
+
+def usage_snapshot():
+    return {name: usage.snapshot() for name, usage in USAGE.items()}
@@ -1,7 +1,15 @@
 import asyncio
+import hashlib
 import json
 import logging
-from config.settings import MAX_RETRIES, RETRY_BASE_DELAY
+import random
+from config.settings import MAX_RETRIES, RETRY_BASE_DELAY, RETRY_MAX_DELAY, RETRY_AFTER_MAX_SECS
+from models.breaker import BREAKERS, CircuitOpenError
+from models.cache import get_cached_response, store_cached_response
+from config.prompts import CACHEABLE_PREFIXES
+from core.metrics import (
+    PROVIDER_CALLS, PROVIDER_ERRORS, PROVIDER_RETRIES, PROVIDER_IN_FLIGHT, PROVIDER_CALL_SECONDS,
+)
 
 # Errors that should NOT be retried (config problems that retrying won't fix)
 _NON_RETRIABLE_ERRORS = frozenset({
@@ -10,9 +18,64 @@ _NON_RETRIABLE_ERRORS = frozenset({
     "NotFoundError",
     "InvalidRequestError",
     "BadRequestError",
+    "ReplayMissError",     # offline replay (models.recording): retrying cannot help
 })
 
 
+def is_rate_limit_error(e: Exception) -> bool:
+    """True for HTTP 429 / quota errors from any of the provider SDKs."""
+    if getattr(e, "status_code", None) == 429 or getattr(e, "code", None) == 429:
+        return True
+    return type(e).__name__ in ("RateLimitError", "ResourceExhausted")
+
+
+def retry_after_secs(e: Exception):
+    """
+    Server-provided retry hint in seconds, if the error carries one.
+    Understands Retry-After / retry-after-ms headers on OpenAI and Anthropic
+    errors and RetryInfo.retryDelay ("12s") in Gemini error details.
+    """
+    response = getattr(e, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after") is not None:
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass   # HTTP-date form; fall back to jittered backoff
+
+    details = getattr(e, "details", None)
+    if isinstance(details, dict):
+        for item in details.get("error", {}).get("details", []) or []:
+            delay = item.get("retryDelay") if isinstance(item, dict) else None
+            if isinstance(delay, str) and delay.endswith("s"):
+                try:
+                    return float(delay[:-1])
+                except ValueError:
+                    pass
+    return None
+
+
+def backoff_delay(attempt: int, e: Exception) -> float:
+    """Full-jitter exponential backoff, or the server's retry hint when it gives one."""
+    hint = retry_after_secs(e)
+    if hint is not None:
+        return min(max(hint, 0.0), RETRY_AFTER_MAX_SECS)
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+def error_kind(e: Exception) -> str:
+    """Coarse failure class used as a metrics label."""
+    if is_rate_limit_error(e):
+        return "rate_limit"
+    if type(e).__name__ in _NON_RETRIABLE_ERRORS:
+        return "non_retriable"
+    if type(e).__name__ == "ValidationError":
+        return "invalid_response"
+    return "error"
+
+
 def clean_json(raw_text: str) -> str:
     """Strip markdown code fences from an LLM JSON response."""
     cleaned = raw_text.strip()
@@ -21,24 +84,87 @@ def clean_json(raw_text: str) -> str:
     return cleaned
 
 
-async def safe_llm_call(fn, prompt, schema_class=None):
+def split_cacheable_prefix(prompt: str):
+    """
+    Split a prompt into (static_prefix, rest) when it starts with one of the
+    CACHEABLE_PREFIXES, so wrappers can mark the prefix for provider-side
+    prompt caching. Returns (None, prompt) otherwise.
+    """
+    for prefix in CACHEABLE_PREFIXES:
+        if prompt.startswith(prefix):
+            return prefix, prompt[len(prefix):]
+    return None, prompt
+
+
+def prefix_cache_key(prefix: str) -> str:
+    """Short stable id for a prompt prefix (routing hint for OpenAI's prompt cache)."""
+    return hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:16]
+
+
+async def safe_llm_call(fn, prompt, schema_class=None, provider=None, bypass_cache=False):
     """
     Generic wrapper around any LLM call.
-    - Retries up to MAX_RETRIES times with exponential backoff
+    - Serves from the on-disk response cache when provider is given
+      (pass bypass_cache=True to force a fresh call)
+    - Retries up to MAX_RETRIES times with full-jitter exponential backoff,
+      honouring Retry-After hints from the provider
+    - Fails fast with CircuitOpenError while the provider's breaker is open
     - Non-retriable errors are re-raised immediately
     - Validates output against schema_class if provided
     """
+    if not bypass_cache:
+        cached = await asyncio.to_thread(get_cached_response, provider, prompt)
+        if cached is not None:
+            try:
+                if schema_class:
+                    return schema_class(**cached).model_dump()
+                return cached
+            except Exception as e:
+                logging.warning(f"Discarding cached {provider} response that failed validation: {e}")
+
+    breaker = BREAKERS.get(provider)
+    label = provider or "unknown"
+
     for attempt in range(MAX_RETRIES + 1):
+        if breaker:
+            try:
+                breaker.before_call()   # raises CircuitOpenError while the provider is unhealthy
+            except CircuitOpenError:
+                PROVIDER_ERRORS.labels(label, "circuit_open").inc()
+                raise
+
         try:
-            raw = await fn(prompt)
+            PROVIDER_CALLS.labels(label).inc()
+            try:
+                with PROVIDER_IN_FLIGHT.labels(label).track_inprogress(), \
+                        PROVIDER_CALL_SECONDS.labels(label).time():
+                    raw = await fn(prompt)
+            except Exception as e:
+                if breaker:
+                    # Only transient provider faults count towards opening the circuit
+                    if type(e).__name__ in _NON_RETRIABLE_ERRORS or is_rate_limit_error(e):
+                        breaker.release_probe()
+                    else:
+                        breaker.record_failure()
+                raise
+            except BaseException:
+                if breaker:
+                    breaker.release_probe()
+                raise
+
+            if breaker:
+                breaker.record_success()
 
             if schema_class:
                 validated = schema_class(**raw)
+                await asyncio.to_thread(store_cached_response, provider, prompt, raw)
                 return validated.model_dump()
 
+            await asyncio.to_thread(store_cached_response, provider, prompt, raw)
             return raw
 
         except Exception as e:
+            PROVIDER_ERRORS.labels(label, error_kind(e)).inc()
             if type(e).__name__ in _NON_RETRIABLE_ERRORS:
                 logging.error(
                     f"Non-retriable error ({type(e).__name__}), aborting: {e}"
@@ -53,7 +179,8 @@ async def safe_llm_call(fn, prompt, schema_class=None):
             if attempt == MAX_RETRIES:
                 raise
 
-            wait = RETRY_BASE_DELAY * (2 ** attempt)
+            PROVIDER_RETRIES.labels(label).inc()
+            wait = backoff_delay(attempt, e)
             logging.debug(f"Retrying in {wait:.1f}s...")
             await asyncio.sleep(wait)
 